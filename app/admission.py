@@ -0,0 +1,230 @@
+import asyncio
+from collections import deque
+from collections.abc import Callable
+from enum import StrEnum
+import time
+
+from sqlalchemy.pool import QueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.database import async_engine
+from app.responses import ORJSONResponse
+
+
+class RouteClass(StrEnum):
+    """
+    Класс маршрута для контроля допуска: у каждого свой лимит одновременных запросов.
+    """
+
+    CATALOG = "catalog"
+    CART = "cart"
+    CHECKOUT = "checkout"
+    AUTH = "auth"
+
+
+CATALOG_PREFIXES = ("/products", "/categories", "/reviews")
+AUTH_PATHS = ("/users/", "/users/token", "/users/refresh-token")
+
+
+def classify_request(method: str, path: str) -> RouteClass | None:
+    """
+    Класс маршрута по методу и пути; None — запрос не ограничивается
+    (административные операции, загрузки, изображения, потоковая выгрузка).
+    """
+    if path.startswith("/cart"):
+        return RouteClass.CART
+    if method == "POST":
+        if path == "/orders/checkout":
+            return RouteClass.CHECKOUT
+        if path in AUTH_PATHS:
+            return RouteClass.AUTH
+        return None
+    if (
+        method in ("GET", "HEAD")
+        and path.startswith(CATALOG_PREFIXES)
+        and path != "/products/export"
+    ):
+        return RouteClass.CATALOG
+    return None
+
+
+def db_pool_saturated() -> bool:
+    """
+    Все соединения пула выданы: новый запрос к базе будет ждать освобождения.
+    Пул без очереди (например, NullPool) не исчерпывается.
+    """
+    pool = async_engine.pool
+    return (
+        isinstance(pool, QueuePool)
+        and pool.checkedout() >= settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    )
+
+
+class AdaptiveLimiter:
+    """
+    Лимит одновременных запросов одного класса с ограниченной очередью ожидания.
+
+    Лимит подстраивается по задержке (AIMD): после каждого «раунда» из limit
+    завершённых запросов средняя задержка до начала ответа сравнивается
+    с целевой. Выше цели — лимит умножается на ADMISSION_DECREASE_FACTOR
+    (но не ниже min_limit); ниже цели и лимит в раунде упирался — растёт на 1
+    (но не выше max_limit). Так при замедлении базы лишние запросы ждут
+    в очереди или получают 503, а не занимают соединения пула.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_limit: int,
+        min_limit: int,
+        latency_target: float,
+        max_queue: int,
+        queue_timeout: float,
+    ):
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.latency_target = latency_target
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._round_samples = 0
+        self._round_latency = 0.0
+        self._round_saturated = False
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """
+        Занимает место; False, если очередь заполнена или ожидание
+        дольше queue_timeout. Отмена запроса во время ожидания не теряет место.
+        """
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return True
+        self._round_saturated = True
+        if len(self._waiters) >= self.max_queue:
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await waiter
+        except BaseException as exc:
+            if waiter.done() and not waiter.cancelled():
+                # Место выдано в тот же момент, когда истёк таймаут или запрос отменён
+                self.release(None)
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(exc, TimeoutError):
+                return False
+            raise
+        return True
+
+    def release(self, latency: float | None) -> None:
+        """
+        Освобождает место и учитывает задержку запроса (None — без замера).
+        """
+        self.in_flight -= 1
+        if latency is not None:
+            self._observe(latency)
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            # Отменённое ожидание удаляется из очереди самим ожидающим чуть позже
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _observe(self, latency: float) -> None:
+        self._round_samples += 1
+        self._round_latency += latency
+        if self._round_samples < int(self.limit):
+            return
+        average = self._round_latency / self._round_samples
+        if average > self.latency_target:
+            self.limit = max(float(self.min_limit), self.limit * settings.ADMISSION_DECREASE_FACTOR)
+        elif self._round_saturated:
+            self.limit = min(float(self.max_limit), self.limit + 1)
+        self._round_samples = 0
+        self._round_latency = 0.0
+        self._round_saturated = False
+
+
+def build_limiters() -> dict[RouteClass, AdaptiveLimiter]:
+    return {
+        route_class: AdaptiveLimiter(
+            max_limit=settings.ADMISSION_MAX_CONCURRENCY[route_class.value],
+            min_limit=settings.ADMISSION_MIN_CONCURRENCY,
+            latency_target=settings.ADMISSION_LATENCY_TARGET[route_class.value],
+            max_queue=settings.ADMISSION_MAX_QUEUE,
+            queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+        )
+        for route_class in RouteClass
+    }
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI-middleware контроля допуска: ограничивает одновременные запросы
+    каждого класса маршрутов (AdaptiveLimiter) и сразу отвечает 503
+    с Retry-After, если очередь класса заполнена или ожидание затянулось.
+    Пока пул соединений с базой исчерпан, ограничиваемые запросы отклоняются
+    даже при свободном месте в лимите класса: иначе они ждали бы соединение
+    до DB_POOL_TIMEOUT. Лимиты свои у каждого воркера.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        limiters: dict[RouteClass, AdaptiveLimiter] | None = None,
+        pool_saturated: Callable[[], bool] = db_pool_saturated,
+    ):
+        self.app = app
+        self.limiters = limiters if limiters is not None else build_limiters()
+        self.pool_saturated = pool_saturated
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        route_class = classify_request(scope["method"], scope["path"])
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiters[route_class]
+        admitted = not self.pool_saturated() and await limiter.acquire()
+        if admitted and self.pool_saturated():
+            # Пул исчерпали, пока запрос ждал в очереди
+            limiter.release(None)
+            admitted = False
+        if not admitted:
+            response = ORJSONResponse(
+                {"detail": "Service is overloaded, try again later"},
+                status_code=503,
+                headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)},
+            )
+            await response(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        latency: float | None = None
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal latency
+            # Задержка — до начала ответа: длинная отдача тела не считается замедлением
+            if message["type"] == "http.response.start":
+                latency = time.perf_counter() - started_at
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            # Ошибка (например, таймаут пула соединений) считается медленным запросом
+            limiter.release(latency if latency is not None else time.perf_counter() - started_at)
@@ -1,15 +1,26 @@
+import asyncio
+from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
+import hashlib
+import logging
+import time
 
+import asyncpg
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 import jwt
+import orjson
 from passlib.context import CryptContext
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import ALGORITHM, SECRET_KEY
+from app.cache import CacheBackend, InMemoryCacheBackend
+from app.config import ALGORITHM, SECRET_KEY, settings
 from app.db_depends import get_async_db
 from app.models.users import UserModel
+from app.password_hasher import password_hasher
+
+logger = logging.getLogger(__name__)
 
 # Создаём контекст для хеширования с использованием bcrypt
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -17,20 +28,152 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="users/token")
+# Оценка размера одной записи кэшей авторизации для лимита по байтам
+AUTH_CACHE_ENTRY_SIZE = 256
+# Канал NOTIFY: payload — ID пользователя, у которого сменились роль или активность
+USER_CHANGES_CHANNEL = "auth_user_changed"
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """
+    Аутентифицированный пользователь запроса: поля UserModel, нужные проверкам доступа.
+    Неизменяемый и не привязан к сессии, поэтому его можно хранить в кэше.
+    """
+
+    id: int
+    email: str
+    role: str
+
+
+class PrincipalCache:
+    """
+    Кэш пользователей по ID с коротким TTL поверх CacheBackend.
+    Счётчик generation, как в ResponseCache, не даёт сохранить пользователя,
+    прочитанного из базы до инвалидации.
+    Кэш работает, только пока воркер подписан на USER_CHANGES_CHANNEL
+    (listen_user_changes): без подписки он пропустил бы изменения из других воркеров.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.generation = 0
+        self.subscribed = False
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"user:{user_id}"
+
+    async def get(self, user_id: int) -> Principal | None:
+        if not self.subscribed:
+            return None
+        value = await self.backend.get(self._key(user_id))
+        return Principal(*orjson.loads(value)) if value is not None else None
 
+    async def store(self, principal: Principal, generation: int) -> None:
+        if self.subscribed and generation == self.generation:
+            key = self._key(principal.id)
+            value = orjson.dumps([principal.id, principal.email, principal.role])
+            await self.backend.set(key, value, [key], self.ttl)
 
-def hash_password(password: str) -> str:
+    async def invalidate(self, user_id: int) -> None:
+        self.generation += 1
+        await self.backend.invalidate([self._key(user_id)])
+
+    async def clear(self) -> None:
+        self.generation += 1
+        await self.backend.clear()
+
+
+# Проверенные access-токены: SHA-256 токена -> [email, id]; запись истекает вместе с exp
+verified_token_cache = InMemoryCacheBackend(
+    max_entries=settings.AUTH_TOKEN_CACHE_MAX_ENTRIES,
+    max_bytes=settings.AUTH_TOKEN_CACHE_MAX_ENTRIES * AUTH_CACHE_ENTRY_SIZE,
+)
+principal_cache = PrincipalCache(
+    InMemoryCacheBackend(
+        max_entries=settings.AUTH_PRINCIPAL_CACHE_MAX_ENTRIES,
+        max_bytes=settings.AUTH_PRINCIPAL_CACHE_MAX_ENTRIES * AUTH_CACHE_ENTRY_SIZE,
+    ),
+    ttl=settings.AUTH_PRINCIPAL_CACHE_TTL,
+)
+
+
+async def notify_user_changed(db: AsyncSession, user_id: int) -> None:
     """
-    Преобразует пароль в хеш с использованием bcrypt.
+    Отправляет уведомление об изменении пользователя в текущей транзакции:
+    PostgreSQL доставляет NOTIFY слушателям только после commit.
     """
-    return pwd_context.hash(password)
+    await db.execute(select(func.pg_notify(USER_CHANGES_CHANNEL, str(user_id))))
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+async def _listen_user_changes_once(dsn: str) -> None:
+    """
+    Слушает USER_CHANGES_CHANNEL на отдельном соединении (не из пула) и сбрасывает
+    записи principal_cache. Возвращает управление, когда соединение потеряно;
+    отсутствие ответа на проверку соединения тоже считается потерей.
+    """
+    changes: asyncio.Queue[str | None] = asyncio.Queue()
+    connection = await asyncpg.connect(dsn)
+    try:
+        connection.add_termination_listener(lambda _: changes.put_nowait(None))
+        await connection.add_listener(
+            USER_CHANGES_CHANNEL, lambda _conn, _pid, _channel, payload: changes.put_nowait(payload)
+        )
+        # Изменения, сделанные до подписки, могли быть пропущены
+        await principal_cache.clear()
+        principal_cache.subscribed = True
+        while True:
+            try:
+                async with asyncio.timeout(settings.AUTH_LISTEN_HEALTHCHECK_INTERVAL):
+                    payload = await changes.get()
+            except TimeoutError:
+                await connection.execute(
+                    "SELECT 1", timeout=settings.AUTH_LISTEN_HEALTHCHECK_INTERVAL
+                )
+                continue
+            if payload is None:
+                return
+            await principal_cache.invalidate(int(payload))
+    finally:
+        principal_cache.subscribed = False
+        connection.terminate()
+
+
+async def listen_user_changes() -> None:
+    """
+    Фоновая задача приложения: распространяет блокировку и смену роли пользователя
+    на кэши всех воркеров. Пока соединения нет, principal_cache не используется
+    и пользователь читается из базы; переподключение — через AUTH_LISTEN_RETRY_INTERVAL.
+    """
+    while True:
+        try:
+            await _listen_user_changes_once(settings.database_url_sync)
+        except Exception:
+            logger.exception("User change listener failed")
+        else:
+            logger.warning("User change listener lost its connection")
+        await asyncio.sleep(settings.AUTH_LISTEN_RETRY_INTERVAL)
+
+
+async def hash_password(password: str) -> str:
+    """
+    Преобразует пароль в хеш с использованием bcrypt (в пуле password_hasher).
+    """
+    return await password_hasher.run(pwd_context.hash, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str | None) -> bool:
     """
     Проверяет, соответствует ли введённый пароль сохранённому хешу.
+    hashed_password=None — пользователь не найден: проверяется фиктивный хеш,
+    чтобы ответ занимал столько же времени и не выдавал существование email.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    if hashed_password is None:
+        await password_hasher.run(pwd_context.dummy_verify)
+        return False
+    return await password_hasher.run(pwd_context.verify, plain_password, hashed_password)
 
 
 def create_access_token(data: dict):
@@ -63,25 +206,33 @@ def create_refresh_token(data: dict):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
-):
-    """
-    Проверяет JWT access-токен и возвращает пользователя из базы.
-    Проверяет, что токен имеет тип "access".
-    """
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+async def _verify_access_token(token: str) -> tuple[str, int | None]:
+    """
+    Проверяет подпись, срок и тип access-токена и возвращает (email, id пользователя).
+    Результат проверки кэшируется по хэшу токена до его exp, поэтому повторный
+    запрос с тем же токеном не выполняет jwt.decode.
+    """
+    key = hashlib.sha256(token.encode()).hexdigest()
+    cached = await verified_token_cache.get(key)
+    if cached is not None:
+        email, user_id = orjson.loads(cached)
+        return email, user_id
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         token_type: str | None = payload.get("token_type")
 
         if email is None:
-            raise credentials_exception
+            raise _credentials_exception()
 
         # Проверяем, что токен имеет тип "access"
         if token_type != "access":
@@ -97,17 +248,45 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     except jwt.PyJWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+
+    user_id = payload.get("id")
+    if not isinstance(user_id, int):
+        user_id = None
+    ttl = payload["exp"] - time.time() if "exp" in payload else settings.AUTH_PRINCIPAL_CACHE_TTL
+    if ttl > 0:
+        await verified_token_cache.set(key, orjson.dumps([email, user_id]), (), ttl)
+    return email, user_id
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """
+    Проверяет JWT access-токен и возвращает пользователя.
+    Проверяет, что токен имеет тип "access".
+    Пользователь берётся из кэша по ID из токена, к базе запрос идёт только
+    при промахе: в установившемся режиме авторизация не обращается к базе.
+    """
+    email, user_id = await _verify_access_token(token)
+    if user_id is not None:
+        principal = await principal_cache.get(user_id)
+        if principal is not None and principal.email == email:
+            return principal
+
+    generation = principal_cache.generation
     result = await db.scalars(
         select(UserModel).where(UserModel.email == email, UserModel.is_active == True)
     )
     user = result.first()
     if user is None:
-        raise credentials_exception
-    return user
+        raise _credentials_exception()
+    principal = Principal(id=user.id, email=user.email, role=user.role)
+    await principal_cache.store(principal, generation)
+    return principal
 
 
-async def get_current_seller(current_user: UserModel = Depends(get_current_user)):
+async def get_current_seller(current_user: Principal = Depends(get_current_user)) -> Principal:
     """
     Проверяет, что пользователь имеет роль 'seller'.
     """
@@ -118,7 +297,7 @@ async def get_current_seller(current_user: UserModel = Depends(get_current_user)
     return current_user
 
 
-async def get_current_admin(current_user: UserModel = Depends(get_current_user)):
+async def get_current_admin(current_user: Principal = Depends(get_current_user)) -> Principal:
     """
     Проверяет, что пользователь имеет роль 'admin'.
     """
@@ -130,7 +309,7 @@ async def get_current_admin(current_user: UserModel = Depends(get_current_user))
     return current_user
 
 
-async def get_current_buyer(current_user: UserModel = Depends(get_current_user)):
+async def get_current_buyer(current_user: Principal = Depends(get_current_user)) -> Principal:
     """
     Проверяет, что пользователь имеет роль 'buyer'.
     """
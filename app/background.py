@@ -0,0 +1,22 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodically(job: Callable[[], Awaitable[int]], interval: float, name: str) -> None:
+    """
+    Фоновая задача приложения: запускает job каждые interval секунд.
+    Ошибка одного прохода логируется и не останавливает задачу;
+    job возвращает число обработанных объектов для лога.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            processed = await job()
+        except Exception:
+            logger.exception("%s failed", name)
+        else:
+            if processed:
+                logger.info("%s processed %d items", name, processed)
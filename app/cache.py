@@ -0,0 +1,220 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+import json
+import time
+from typing import Any
+
+from fastapi import Response
+
+from app.config import settings
+
+# Теги инвалидации кэша списков
+ALL_PRODUCTS_TAG = "products"
+CATEGORY_TREE_TAG = "categories:tree"
+STOCK_FILTER_TAG = "products:stock"
+
+
+def product_tag(product_id: int) -> str:
+    return f"product:{product_id}"
+
+
+def category_tag(category_id: int) -> str:
+    return f"category:{category_id}"
+
+
+def category_subtree_tag(category_id: int) -> str:
+    return f"category-subtree:{category_id}"
+
+
+def make_cache_key(namespace: str, **params: Any) -> str:
+    """
+    Строит ключ кэша из нормализованных параметров запроса:
+    None отбрасывается, строки приводятся к нижнему регистру без лишних пробелов.
+    """
+    normalized = {}
+    for name, value in sorted(params.items()):
+        if value is None:
+            continue
+        if isinstance(value, str):
+            value = " ".join(value.split()).casefold()
+        normalized[name] = value
+    return f"{namespace}:{json.dumps(normalized, separators=(',', ':'), default=str)}"
+
+
+class CacheBackend(ABC):
+    """
+    Интерфейс хранилища кэша. Значения — готовые байты ответа,
+    теги используют для точечной инвалидации.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, tags: Iterable[str], ttl: float) -> None: ...
+
+    @abstractmethod
+    async def invalidate(self, tags: Iterable[str]) -> None: ...
+
+    @abstractmethod
+    async def clear(self) -> None: ...
+
+
+@dataclass(slots=True)
+class _Entry:
+    value: bytes
+    tags: frozenset[str]
+    expires_at: float
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """
+    Кэш в памяти процесса с вытеснением LRU, TTL и ограничением
+    по числу записей и суммарному размеру значений.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+        self._size = 0
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry.value
+
+    async def set(self, key: str, value: bytes, tags: Iterable[str], ttl: float) -> None:
+        if len(value) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        entry = _Entry(value=value, tags=frozenset(tags), expires_at=time.monotonic() + ttl)
+        self._entries[key] = entry
+        self._size += len(value)
+        for tag in entry.tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            for key in self._tags.pop(tag, set()):
+                self._remove(key)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+        self._size = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._size -= len(entry.value)
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class ResponseCache:
+    """
+    Кэш готовых JSON-ответов поверх CacheBackend.
+    Счётчик generation защищает от записи в кэш результата, прочитанного
+    из базы до инвалидации, но сохраняемого уже после неё.
+    Вместе с телом хранятся код ответа и заголовки (ETag и т. п.):
+    в значение бэкенда они пишутся JSON-строкой перед телом.
+    Ответы с ошибкой (например, 404) можно держать в отдельном miss_backend,
+    чтобы перебор несуществующих ключей не вытеснял из LRU настоящие ответы.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float, miss_backend: CacheBackend | None = None):
+        self.backend = backend
+        self.miss_backend = miss_backend
+        self.ttl = ttl
+        self.generation = 0
+
+    async def get(self, key: str) -> Response | None:
+        value = await self.backend.get(key)
+        if value is None and self.miss_backend is not None:
+            value = await self.miss_backend.get(key)
+        if value is None:
+            return None
+        meta, _, body = value.partition(b"\n")
+        status_code, headers = json.loads(meta)
+        return Response(
+            content=body,
+            status_code=status_code,
+            headers=headers,
+            media_type="application/json",
+        )
+
+    async def store(
+        self,
+        key: str,
+        body: bytes,
+        tags: Iterable[str],
+        generation: int,
+        *,
+        status_code: int = 200,
+        headers: dict[str, str] | None = None,
+        ttl: float | None = None,
+    ) -> Response:
+        if generation == self.generation:
+            meta = json.dumps([status_code, headers or {}], separators=(",", ":")).encode()
+            backend = self.backend
+            if status_code >= 400 and self.miss_backend is not None:
+                backend = self.miss_backend
+            await backend.set(key, meta + b"\n" + body, tags, ttl or self.ttl)
+        return Response(
+            content=body,
+            status_code=status_code,
+            headers=headers,
+            media_type="application/json",
+        )
+
+    async def invalidate(self, *tags: str) -> None:
+        self.generation += 1
+        await self.backend.invalidate(tags)
+        if self.miss_backend is not None:
+            await self.miss_backend.invalidate(tags)
+
+
+listing_cache = ResponseCache(
+    InMemoryCacheBackend(
+        max_entries=settings.LISTING_CACHE_MAX_ENTRIES,
+        max_bytes=settings.LISTING_CACHE_MAX_BYTES,
+    ),
+    ttl=settings.LISTING_CACHE_TTL,
+)
+
+product_cache = ResponseCache(
+    InMemoryCacheBackend(
+        max_entries=settings.PRODUCT_CACHE_MAX_ENTRIES,
+        max_bytes=settings.PRODUCT_CACHE_MAX_BYTES,
+    ),
+    ttl=settings.PRODUCT_CACHE_TTL,
+    miss_backend=InMemoryCacheBackend(
+        max_entries=settings.PRODUCT_CACHE_NEGATIVE_MAX_ENTRIES,
+        max_bytes=settings.PRODUCT_CACHE_NEGATIVE_MAX_BYTES,
+    ),
+)
+
+suggest_cache = ResponseCache(
+    InMemoryCacheBackend(
+        max_entries=settings.SUGGEST_CACHE_MAX_ENTRIES,
+        max_bytes=settings.SUGGEST_CACHE_MAX_BYTES,
+    ),
+    ttl=settings.SUGGEST_CACHE_TTL,
+)
@@ -0,0 +1,155 @@
+import asyncio
+import hashlib
+import time
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.categories import CategoryModel
+from app.models.products import ProductModel
+from app.schemas.categories import CategorySchema, CategoryTreeSchema
+
+# Неизвестный ID может означать категорию, созданную другим воркером,
+# но перечитывать реестр из-за него чаще этого интервала не нужно
+UNKNOWN_ID_RELOAD_INTERVAL = 1.0
+
+
+class CategoryRegistry:
+    """
+    Реестр категорий в памяти процесса. Загружается при старте приложения,
+    перезагружается после изменения категорий и раз в CATEGORY_REGISTRY_TTL
+    (изменения, сделанные другими воркерами). Количество активных товаров
+    по категориям обновляется отдельно и дешевле — одним GROUP BY.
+    Устаревание проверяется ещё раз под блокировкой: конкурентные запросы,
+    дождавшиеся её, не повторяют перезагрузку, уже выполненную другим запросом.
+    """
+
+    def __init__(self):
+        self._categories: dict[int, CategorySchema] = {}
+        self._product_counts: dict[int, int] = {}
+        self._loaded_at: float | None = None
+        self._counts_loaded_at: float | None = None
+        # Растёт при каждой инвалидации счётчиков: GROUP BY, начатый до записи
+        # товара, не должен пометить счётчики свежими
+        self._counts_version = 0
+        self._lock = asyncio.Lock()
+        # Хэш содержимого реестра: одинаков у всех воркеров с одинаковыми данными
+        self.fingerprint: str | None = None
+
+    async def load(self, db: AsyncSession) -> None:
+        """
+        Полностью перечитывает категории из базы.
+        """
+        async with self._lock:
+            await self._load(db)
+
+    async def _reload(self, db: AsyncSession, seen_loaded_at: float | None) -> None:
+        """
+        Перечитывает категории, если с момента проверки (seen_loaded_at)
+        их не перечитал другой запрос.
+        """
+        async with self._lock:
+            if self._loaded_at == seen_loaded_at:
+                await self._load(db)
+
+    async def _load(self, db: AsyncSession) -> None:
+        result = await db.scalars(select(CategoryModel))
+        self._categories = {
+            category.id: CategorySchema.model_validate(category) for category in result.all()
+        }
+        digest = hashlib.blake2b(digest_size=16)
+        for category_id in sorted(self._categories):
+            digest.update(self._categories[category_id].model_dump_json().encode())
+        self.fingerprint = digest.hexdigest()
+        self._loaded_at = time.monotonic()
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        loaded_at = self._loaded_at
+        if loaded_at is None or self._expired(loaded_at, settings.CATEGORY_REGISTRY_TTL):
+            await self._reload(db, loaded_at)
+
+    def invalidate_counts(self) -> None:
+        """
+        Помечает счётчики товаров устаревшими (после записи товара).
+        """
+        self._counts_version += 1
+        self._counts_loaded_at = None
+
+    async def is_active(self, db: AsyncSession, category_id: int) -> bool:
+        """
+        Проверяет, что категория существует и активна.
+        """
+        await self.ensure_loaded(db)
+        loaded_at = self._loaded_at
+        if (
+            category_id not in self._categories
+            and loaded_at is not None
+            and self._expired(loaded_at, UNKNOWN_ID_RELOAD_INTERVAL)
+        ):
+            await self._reload(db, loaded_at)
+        category = self._categories.get(category_id)
+        return category is not None and category.is_active
+
+    async def active_categories(self, db: AsyncSession) -> list[CategorySchema]:
+        await self.ensure_loaded(db)
+        return [category for category in self._categories.values() if category.is_active]
+
+    async def tree(self, db: AsyncSession) -> list[CategoryTreeSchema]:
+        """
+        Строит дерево активных категорий с количеством активных товаров в каждом узле.
+        Подкатегории неактивной категории в дерево не попадают.
+        """
+        await self.ensure_loaded(db)
+        await self._ensure_counts(db)
+
+        children: dict[int | None, list[CategorySchema]] = {}
+        for category in self._categories.values():
+            if category.is_active:
+                children.setdefault(category.parent_id, []).append(category)
+
+        def build(category: CategorySchema) -> CategoryTreeSchema:
+            nodes = [build(child) for child in sorted(children.get(category.id, []), key=_by_name)]
+            own_count = self._product_counts.get(category.id, 0)
+            return CategoryTreeSchema(
+                id=category.id,
+                name=category.name,
+                parent_id=category.parent_id,
+                product_count=own_count,
+                total_product_count=own_count + sum(node.total_product_count for node in nodes),
+                children=nodes,
+            )
+
+        return [build(root) for root in sorted(children.get(None, []), key=_by_name)]
+
+    def _counts_fresh(self) -> bool:
+        return self._counts_loaded_at is not None and not self._expired(
+            self._counts_loaded_at, settings.CATEGORY_REGISTRY_COUNTS_TTL
+        )
+
+    async def _ensure_counts(self, db: AsyncSession) -> None:
+        if self._counts_fresh():
+            return
+        async with self._lock:
+            if self._counts_fresh():
+                return
+            version = self._counts_version
+            result = await db.execute(
+                select(ProductModel.category_id, func.count())
+                .where(ProductModel.is_active == True)
+                .group_by(ProductModel.category_id)
+            )
+            self._product_counts = dict(result.tuples().all())
+            if version == self._counts_version:
+                self._counts_loaded_at = time.monotonic()
+
+    @staticmethod
+    def _expired(loaded_at: float, ttl: float) -> bool:
+        return time.monotonic() - loaded_at >= ttl
+
+
+def _by_name(category: CategorySchema) -> str:
+    return category.name.casefold()
+
+
+category_registry = CategoryRegistry()
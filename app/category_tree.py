@@ -0,0 +1,101 @@
+from sqlalchemy import Select, and_, delete, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models.categories import CategoryClosureModel, CategoryModel
+
+
+def subtree_category_ids(category_id: int) -> Select:
+    """
+    Запрос ID активных категорий поддерева (включая саму категорию)
+    одним соединением с таблицей замыкания.
+    """
+    return (
+        select(CategoryClosureModel.descendant_id)
+        .join(CategoryModel, CategoryModel.id == CategoryClosureModel.descendant_id)
+        .where(CategoryClosureModel.ancestor_id == category_id, CategoryModel.is_active == True)
+    )
+
+
+async def get_ancestor_ids(db: AsyncSession, category_id: int) -> list[int]:
+    """
+    Возвращает ID всех предков категории, включая её саму.
+    """
+    result = await db.scalars(
+        select(CategoryClosureModel.ancestor_id).where(
+            CategoryClosureModel.descendant_id == category_id
+        )
+    )
+    return list(result.all())
+
+
+async def is_in_subtree(db: AsyncSession, root_id: int, category_id: int) -> bool:
+    """
+    Проверяет, входит ли category_id в поддерево root_id.
+    """
+    result = await db.scalar(
+        select(CategoryClosureModel.depth).where(
+            CategoryClosureModel.ancestor_id == root_id,
+            CategoryClosureModel.descendant_id == category_id,
+        )
+    )
+    return result is not None
+
+
+async def add_category_to_closure(db: AsyncSession, category_id: int, parent_id: int | None):
+    """
+    Добавляет строки замыкания для новой (листовой) категории без commit.
+    """
+    await db.execute(
+        insert(CategoryClosureModel).values(
+            ancestor_id=category_id, descendant_id=category_id, depth=0
+        )
+    )
+    if parent_id is None:
+        return
+    await db.execute(
+        insert(CategoryClosureModel).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(
+                CategoryClosureModel.ancestor_id,
+                literal(category_id),
+                CategoryClosureModel.depth + 1,
+            ).where(CategoryClosureModel.descendant_id == parent_id),
+        )
+    )
+
+
+async def move_category_subtree(db: AsyncSession, category_id: int, new_parent_id: int | None):
+    """
+    Переносит поддерево категории под нового родителя без commit:
+    удаляет связи поддерева со старыми предками и создаёт связи с новыми.
+    """
+    subtree = select(CategoryClosureModel.descendant_id).where(
+        CategoryClosureModel.ancestor_id == category_id
+    )
+    await db.execute(
+        delete(CategoryClosureModel).where(
+            CategoryClosureModel.descendant_id.in_(subtree),
+            CategoryClosureModel.ancestor_id.not_in(subtree),
+        )
+    )
+    if new_parent_id is None:
+        return
+
+    parent_path = aliased(CategoryClosureModel)
+    subtree_path = aliased(CategoryClosureModel)
+    await db.execute(
+        insert(CategoryClosureModel).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(
+                parent_path.ancestor_id,
+                subtree_path.descendant_id,
+                parent_path.depth + subtree_path.depth + 1,
+            ).where(
+                and_(
+                    parent_path.descendant_id == new_parent_id,
+                    subtree_path.ancestor_id == category_id,
+                )
+            ),
+        )
+    )
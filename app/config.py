@@ -11,10 +11,139 @@ class Settings(BaseSettings):
     POSTGRES_PORT: int = 5432
     POSTGRES_DB: str = "ecommerce_db"
 
+    # Пул соединений с PostgreSQL: размер, сверх него временно и ожидание соединения
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 10.0
+
+    # Контроль допуска: лимит одновременных запросов и целевая задержка до начала
+    # ответа (секунды) по классам маршрутов. Лимит снижается в ADMISSION_DECREASE_FACTOR
+    # раз при задержке выше цели и растёт на 1, пока задержка в норме. Сверх лимита
+    # запросы ждут в очереди (не дольше ADMISSION_QUEUE_TIMEOUT), затем получают 503.
+    # Пока все соединения пула выданы, 503 получают все ограничиваемые запросы
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_MAX_CONCURRENCY: dict[str, int] = {
+        "catalog": 64,
+        "cart": 32,
+        "checkout": 16,
+        "auth": 16,
+    }
+    ADMISSION_LATENCY_TARGET: dict[str, float] = {
+        "catalog": 0.25,
+        "cart": 0.5,
+        "checkout": 1.0,
+        "auth": 1.0,
+    }
+    ADMISSION_MIN_CONCURRENCY: int = 2
+    ADMISSION_DECREASE_FACTOR: float = 0.8
+    ADMISSION_MAX_QUEUE: int = 100
+    ADMISSION_QUEUE_TIMEOUT: float = 2.0
+    ADMISSION_RETRY_AFTER: int = 1
+
     # JWT настройки
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
 
+    # Кэш проверенных access-токенов (запись живёт до exp токена) и кэш
+    # пользователей по ID. Блокировка и смена роли рассылаются всем воркерам
+    # через LISTEN/NOTIFY; без подписки кэш пользователей не используется.
+    # Соединение подписки проверяется каждые AUTH_LISTEN_HEALTHCHECK_INTERVAL
+    AUTH_TOKEN_CACHE_MAX_ENTRIES: int = 50_000
+    AUTH_PRINCIPAL_CACHE_TTL: float = 60.0
+    AUTH_PRINCIPAL_CACHE_MAX_ENTRIES: int = 20_000
+    AUTH_LISTEN_HEALTHCHECK_INTERVAL: float = 5.0
+    AUTH_LISTEN_RETRY_INTERVAL: float = 1.0
+
+    # Пул потоков bcrypt: число потоков, максимум ожидающих запросов и сколько
+    # запрос ждёт свободный поток, прежде чем получить 503
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = 5.0
+
+    # Кэш ответов списков каталога
+    LISTING_CACHE_TTL: float = 30.0
+    LISTING_CACHE_MAX_ENTRIES: int = 2048
+    LISTING_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+
+    # Кэш карточек товаров. Запись сбрасывает карточку по тегам только в своём воркере,
+    # в остальных изменение видно не позже PRODUCT_CACHE_TTL.
+    # Отсутствующие и неактивные ID (404) лежат в отдельном небольшом LRU
+    PRODUCT_CACHE_TTL: float = 30.0
+    PRODUCT_CACHE_MAX_ENTRIES: int = 10_000
+    PRODUCT_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    PRODUCT_CACHE_NEGATIVE_TTL: float = 30.0
+    PRODUCT_CACHE_NEGATIVE_MAX_ENTRIES: int = 2_000
+    PRODUCT_CACHE_NEGATIVE_MAX_BYTES: int = 1024 * 1024
+
+    # Кэш горячих префиксов автодополнения
+    SUGGEST_CACHE_TTL: float = 60.0
+    SUGGEST_CACHE_MAX_ENTRIES: int = 4096
+    SUGGEST_CACHE_MAX_BYTES: int = 4 * 1024 * 1024
+    # Короче этого префикса подсказки не ищутся; сортируется не больше
+    # limit * SUGGEST_CANDIDATE_FACTOR совпадений из индекса
+    SUGGEST_MIN_PREFIX_LENGTH: int = 2
+    SUGGEST_CANDIDATE_FACTOR: int = 5
+
+    # Нечёткий поиск по триграммам, если полнотекстовый ничего не нашёл.
+    # Порог не может быть ниже pg_trgm.similarity_threshold (по умолчанию 0.3)
+    SEARCH_FUZZY_THRESHOLD: float = 0.3
+    SEARCH_FUZZY_MAX_CANDIDATES: int = 200
+
+    # Реестр категорий в памяти: полная перезагрузка и обновление счётчиков товаров
+    CATEGORY_REGISTRY_TTL: float = 300.0
+    CATEGORY_REGISTRY_COUNTS_TTL: float = 60.0
+
+    # Размер пачки серверного курсора при потоковой выгрузке каталога
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Массовый импорт товаров: размер пачки COPY и лимит строк в одном файле
+    IMPORT_BATCH_SIZE: int = 1000
+    IMPORT_MAX_ROWS: int = 50_000
+    # Предельная длина строки файла и записи CSV (с переводами строк внутри кавычек)
+    # в символах; более длинные отклоняются как ошибочные строки
+    IMPORT_MAX_LINE_LENGTH: int = 64 * 1024
+    IMPORT_MAX_RECORD_LENGTH: int = 64 * 1024
+
+    # max-age в Cache-Control для публичных ответов каталога
+    CATALOG_CACHE_MAX_AGE: int = 30
+
+    # Раздача /media: файлы неизменяемы (имя из хэша содержимого) и кэшируются на год.
+    # MEDIA_PRECOMPRESSED включает выдачу готовых соседних .br/.gz файлов;
+    # MEDIA_ACCEL_REDIRECT_PREFIX передаёт отправку файла nginx (X-Accel-Redirect)
+    MEDIA_CACHE_MAX_AGE: int = 365 * 24 * 60 * 60
+    MEDIA_PRECOMPRESSED: bool = False
+    MEDIA_ACCEL_REDIRECT_PREFIX: str = ""
+    # Сборщик файлов без ссылок: период прохода и сколько файл без ссылок
+    # (или ещё не привязанный к товару) хранится до удаления
+    MEDIA_SWEEP_INTERVAL: float = 60 * 60
+    MEDIA_ORPHAN_GRACE: float = 60 * 60
+
+    # Загрузка изображений: размер пачки при копировании и срок жизни
+    # незавершённой возобновляемой загрузки
+    IMAGE_UPLOAD_CHUNK_SIZE: int = 64 * 1024
+    IMAGE_UPLOAD_SESSION_TTL: float = 24 * 60 * 60
+
+    # Уменьшенные WebP-копии изображений: вариант -> максимальная сторона в пикселях.
+    # Рендер идёт в пуле процессов, готовые файлы хранятся на диске с вытеснением LRU
+    IMAGE_VARIANT_SIZES: dict[str, int] = {"thumbnail": 160, "card": 480, "full": 1200}
+    IMAGE_VARIANT_WEBP_QUALITY: int = 80
+    IMAGE_VARIANT_WORKERS: int = 2
+    IMAGE_VARIANT_MAX_PENDING: int = 32
+    IMAGE_VARIANT_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    # Больше пикселей не декодируем: одноцветный PNG на 150 Мп укладывается в 2 МБ,
+    # но в памяти процесса рендера занимает сотни мегабайт
+    IMAGE_VARIANT_MAX_PIXELS: int = 40_000_000
+
+    # Фоновая сверка агрегатов оценок товаров (review_count, rating_sum) с отзывами
+    RATING_RECONCILE_INTERVAL: float = 6 * 60 * 60
+    RATING_RECONCILE_BATCH_SIZE: int = 1000
+
+    # Максимум ID в одном запросе GET /products/batch
+    BATCH_LOOKUP_MAX_IDS: int = 300
+
+    # Максимум позиций в одном запросе PATCH /products/bulk
+    BULK_UPDATE_MAX_ITEMS: int = 5000
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
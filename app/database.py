@@ -22,7 +22,13 @@ from sqlalchemy.orm import DeclarativeBase
 DATABASE_URL = settings.database_url_async
 
 # Создаём асинхронный Engine
-async_engine = create_async_engine(DATABASE_URL, echo=True)
+async_engine = create_async_engine(
+    DATABASE_URL,
+    echo=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+)
 
 # Настраиваем фабрику асинхронных сеансов
 async_session_maker = async_sessionmaker(async_engine, expire_on_commit=False, class_=AsyncSession)
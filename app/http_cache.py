@@ -0,0 +1,73 @@
+from collections.abc import Mapping
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+import hashlib
+import json
+from typing import Any
+
+from fastapi import Request, Response, status
+
+from app.config import settings
+
+VALIDATOR_HEADERS = frozenset({"etag", "last-modified", "cache-control", "vary"})
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Слабый ETag из валидаторов ответа (время изменения, параметры фильтров и т. п.).
+    Тело ответа для этого сериализовать не нужно.
+    """
+    raw = json.dumps(parts, separators=(",", ":"), default=str).encode()
+    return f'W/"{hashlib.blake2b(raw, digest_size=16).hexdigest()}"'
+
+
+def cache_headers(etag: str, last_modified: datetime | None = None) -> dict[str, str]:
+    """
+    Заголовки кэширования публичных ответов каталога для клиентов и обратного прокси.
+    Имена в нижнем регистре, как их отдаёт Response.headers.
+    """
+    headers = {
+        "etag": etag,
+        "cache-control": f"public, max-age={settings.CATALOG_CACHE_MAX_AGE}",
+        "vary": "Accept-Encoding",
+    }
+    if last_modified is not None:
+        headers["last-modified"] = format_datetime(last_modified.astimezone(UTC), usegmt=True)
+    return headers
+
+
+def is_not_modified(request: Request, headers: Mapping[str, str]) -> bool:
+    """
+    Проверяет условные заголовки запроса против ETag и Last-Modified ответа.
+    If-None-Match имеет приоритет над If-Modified-Since, ETag сравниваются
+    по слабому правилу.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        etag = headers["etag"].removeprefix("W/")
+        return etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+
+    if_modified_since = request.headers.get("if-modified-since")
+    last_modified = headers.get("last-modified")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=UTC)
+    # Last-Modified уже округлён до секунды форматом HTTP-даты
+    return parsedate_to_datetime(last_modified) <= since
+
+
+def not_modified_response(headers: Mapping[str, str]) -> Response:
+    """
+    Ответ 304: только валидаторы и заголовки кэширования, без Content-Length тела.
+    """
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={name: value for name, value in headers.items() if name in VALIDATOR_HEADERS},
+    )
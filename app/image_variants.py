@@ -0,0 +1,208 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import contextlib
+import logging
+import os
+from pathlib import Path
+
+from fastapi.concurrency import run_in_threadpool
+from PIL import Image, ImageOps
+
+from app.config import settings
+from app.media import VARIANT_ROOT, media_storage, variant_path
+
+logger = logging.getLogger(__name__)
+
+
+def _init_render_worker(max_pixels: int) -> None:
+    # Порог Pillow для DecompressionBombError — удвоенный MAX_IMAGE_PIXELS
+    Image.MAX_IMAGE_PIXELS = max_pixels // 2
+
+
+def _render_variants(source: str, targets: list[tuple[str, int]], quality: int) -> int:
+    """
+    Рендерит WebP-копии одного изображения (исходник открывается один раз).
+    Выполняется в отдельном процессе; возвращает суммарный размер записанных файлов.
+    """
+    written = 0
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if image.has_transparency_data else "RGB")
+        # От большей копии к меньшей, уменьшая одно и то же изображение:
+        # полноразмерная копия в памяти не создаётся на каждый вариант
+        for target, max_side in sorted(targets, key=lambda item: item[1], reverse=True):
+            # thumbnail сохраняет пропорции и не увеличивает маленькие изображения
+            image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+            temp_path = f"{target}.{os.getpid()}.tmp"
+            image.save(temp_path, "WEBP", quality=quality, method=4)
+            os.replace(temp_path, target)
+            written += os.path.getsize(target)
+    return written
+
+
+class VariantDiskCache:
+    """
+    Учёт размера каталога с копиями и вытеснение LRU по времени последнего
+    обращения (mtime, который обновляется при каждой выдаче файла).
+    Размер считается в памяти процесса и перепроверяется сканированием
+    каталога перед вытеснением, поэтому записи других воркеров тоже учитываются.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._size: int | None = None
+
+    def _files(self) -> list[os.DirEntry]:
+        entries = []
+        for variant_dir in os.scandir(self.root):
+            if variant_dir.is_dir():
+                entries.extend(
+                    entry
+                    for entry in os.scandir(variant_dir.path)
+                    if entry.is_file() and entry.name.endswith(".webp")
+                )
+        return entries
+
+    def _evict(self) -> None:
+        files = []
+        for entry in self._files():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        # Освобождаем с запасом, чтобы не сканировать каталог на каждой записи
+        target = self.max_bytes * 9 // 10
+        for _, size, path in sorted(files):
+            if total <= target:
+                break
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)
+            total -= size
+        self._size = total
+
+    async def added(self, size: int) -> None:
+        if self._size is None:
+            self._size = sum(entry.stat().st_size for entry in await run_in_threadpool(self._files))
+        else:
+            self._size += size
+        if self._size > self.max_bytes:
+            await run_in_threadpool(self._evict)
+
+    @staticmethod
+    def touch(path: Path) -> None:
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(path)
+
+
+class VariantRenderer:
+    """
+    Рендер копий в ограниченном пуле процессов. Одновременно выполняется не больше
+    IMAGE_VARIANT_MAX_PENDING заданий, одинаковые запросы на одну копию объединяются.
+    Если процесс рендера упал (например, по OOM), сломанный пул пересоздаётся
+    при следующем задании.
+    """
+
+    def __init__(self, cache: VariantDiskCache):
+        self.cache = cache
+        self._pool: ProcessPoolExecutor | None = None
+        self._slots = asyncio.Semaphore(settings.IMAGE_VARIANT_MAX_PENDING)
+        self._inflight: dict[tuple[str, ...], asyncio.Future] = {}
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_VARIANT_WORKERS,
+                initializer=_init_render_worker,
+                initargs=(settings.IMAGE_VARIANT_MAX_PIXELS,),
+            )
+        return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        # Параллельные задания могли уже заменить сломанный пул новым
+        if self._pool is pool:
+            self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _render(self, file_name: str, variants: tuple[str, ...]) -> None:
+        key = (file_name, *variants)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            targets = []
+            for variant in variants:
+                target = variant_path(file_name, variant)
+                target.parent.mkdir(exist_ok=True)
+                targets.append((str(target), settings.IMAGE_VARIANT_SIZES[variant]))
+            async with self._slots:
+                pool = self._get_pool()
+                try:
+                    written = await asyncio.get_running_loop().run_in_executor(
+                        pool,
+                        _render_variants,
+                        str(media_storage.local_path(file_name)),
+                        targets,
+                        settings.IMAGE_VARIANT_WEBP_QUALITY,
+                    )
+                except BrokenProcessPool:
+                    self._discard_pool(pool)
+                    raise
+            await self.cache.added(written)
+            future.set_result(None)
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Помечаем исключение полученным, иначе asyncio предупредит о нём,
+            # если параллельных ожидающих не было
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def pregenerate(self, image_url: str) -> None:
+        """
+        Фоновая генерация всех копий после загрузки изображения.
+        Если пул перегружен, задание пропускается: копии будут созданы по запросу.
+        """
+        if self._slots.locked():
+            return
+        try:
+            await self._render(Path(image_url).name, tuple(settings.IMAGE_VARIANT_SIZES))
+        except Exception:
+            logger.exception("Failed to render image variants for %s", image_url)
+
+    async def get(self, file_name: str, variant: str) -> Path | None:
+        """
+        Путь к готовой копии; отсутствующая копия рендерится по запросу.
+        None, если исходного изображения нет, его не удалось декодировать
+        или процесс рендера упал.
+        """
+        target = variant_path(file_name, variant)
+        if await run_in_threadpool(target.exists):
+            await run_in_threadpool(self.cache.touch, target)
+            return target
+        if not await run_in_threadpool(media_storage.local_path(file_name).is_file):
+            return None
+        try:
+            await self._render(file_name, (variant,))
+        except (OSError, Image.DecompressionBombError, BrokenProcessPool):
+            logger.warning("Cannot render %s variant of %s", variant, file_name, exc_info=True)
+            return None
+        return target
+
+
+variant_renderer = VariantRenderer(
+    VariantDiskCache(VARIANT_ROOT, settings.IMAGE_VARIANT_CACHE_MAX_BYTES)
+)
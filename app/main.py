@@ -1,15 +1,73 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 
-from app.routers import carts, categories, orders, products, reviews, users
+from app.admission import AdmissionControlMiddleware
+from app.auth import listen_user_changes
+from app.background import run_periodically
+from app.category_registry import category_registry
+from app.config import settings
+from app.database import async_session_maker
+from app.image_variants import variant_renderer
+from app.media_files import MediaFiles
+from app.media_gc import sweep_media
+from app.password_hasher import password_hasher
+from app.ratings import reconcile_product_ratings
+from app.responses import ORJSONResponse
+from app.routers import carts, categories, images, orders, products, reviews, uploads, users
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Загружает реестр категорий и запускает фоновые задачи (сборщик файлов
+    изображений, сверка агрегатов оценок, подписка на изменения пользователей)
+    при старте приложения, а при завершении останавливает их, пул рендера
+    изображений и пул хеширования паролей.
+    """
+    async with async_session_maker() as db:
+        await category_registry.load(db)
+    background_tasks = [
+        asyncio.create_task(
+            run_periodically(sweep_media, settings.MEDIA_SWEEP_INTERVAL, "Media sweep")
+        ),
+        asyncio.create_task(
+            run_periodically(
+                reconcile_product_ratings,
+                settings.RATING_RECONCILE_INTERVAL,
+                "Rating reconciliation",
+            )
+        ),
+        asyncio.create_task(listen_user_changes()),
+    ]
+    yield
+    for task in background_tasks:
+        task.cancel()
+    with suppress(asyncio.CancelledError):
+        await asyncio.gather(*background_tasks)
+    variant_renderer.shutdown()
+    password_hasher.shutdown()
 
 
 # Создаём приложение FastAPI
 app = FastAPI(
     title="FastAPI Интернет-магазин",
     version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(AdmissionControlMiddleware)
+app.mount(
+    "/media",
+    MediaFiles(
+        directory="media",
+        precompressed=settings.MEDIA_PRECOMPRESSED,
+        accel_redirect_prefix=settings.MEDIA_ACCEL_REDIRECT_PREFIX,
+    ),
+    name="media",
 )
-app.mount("/media", StaticFiles(directory="media"), name="media")
 # Подключаем маршруты категорий и товаров
 app.include_router(categories.router)
 app.include_router(products.router)
@@ -18,6 +76,8 @@ app.include_router(reviews.router)
 
 app.include_router(carts.router)
 app.include_router(orders.router)
+app.include_router(uploads.router)
+app.include_router(images.router)
 
 
 # Корневой эндпоинт для проверки
@@ -0,0 +1,265 @@
+from collections.abc import AsyncIterable
+import fcntl
+import hashlib
+import json
+import os
+from pathlib import Path
+import tempfile
+import time
+from typing import BinaryIO
+import uuid
+
+from fastapi import HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.media_storage import LocalMediaStorage, MediaStorage
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+MEDIA_ROOT = BASE_DIR / "media" / "products"
+MEDIA_ROOT.mkdir(parents=True, exist_ok=True)
+# Незавершённые загрузки лежат вне /media (его раздаёт MediaFiles),
+# но на той же файловой системе, чтобы перенос в MEDIA_ROOT был атомарным
+UPLOAD_ROOT = BASE_DIR / "uploads"
+UPLOAD_ROOT.mkdir(parents=True, exist_ok=True)
+# Кэш уменьшенных WebP-копий: VARIANT_ROOT/<вариант>/<имя оригинала без расширения>.webp
+VARIANT_ROOT = BASE_DIR / "media_cache" / "products"
+VARIANT_ROOT.mkdir(parents=True, exist_ok=True)
+IMAGE_VARIANTS_URL = "/images/products"
+MEDIA_URL = "/media/products"
+media_storage: MediaStorage = LocalMediaStorage(MEDIA_ROOT, MEDIA_URL)
+
+MAX_IMAGE_SIZE = 2 * 1024 * 1024  # 2 097 152 байт
+# Сигнатуры (magic bytes) допустимых форматов: (смещение, байты) -> (MIME-тип, расширение)
+IMAGE_SIGNATURES = (
+    (((0, b"\xff\xd8\xff"),), ("image/jpeg", ".jpg")),
+    (((0, b"\x89PNG\r\n\x1a\n"),), ("image/png", ".png")),
+    (((0, b"RIFF"), (8, b"WEBP")), ("image/webp", ".webp")),
+)
+SNIFF_SIZE = 12
+
+
+def sniff_image_type(head: bytes) -> tuple[str, str] | None:
+    """
+    Определяет формат изображения по первым байтам файла, а не по заголовку клиента.
+    """
+    for signature, image_type in IMAGE_SIGNATURES:
+        if all(head[offset : offset + len(magic)] == magic for offset, magic in signature):
+            return image_type
+    return None
+
+
+def _invalid_image() -> HTTPException:
+    return HTTPException(status.HTTP_400_BAD_REQUEST, "Only JPG, PNG or WebP images are allowed")
+
+
+def _image_too_large() -> HTTPException:
+    return HTTPException(status.HTTP_400_BAD_REQUEST, "Image is too large")
+
+
+def _content_hash() -> hashlib.blake2b:
+    """Хэш содержимого изображения, из которого строится имя файла."""
+    return hashlib.blake2b(digest_size=16)
+
+
+def _store_image_stream(source: BinaryIO) -> str:
+    """
+    Копирует изображение из файлового объекта пачками во временный файл:
+    формат проверяется по первым байтам, копирование прерывается, как только
+    превышен MAX_IMAGE_SIZE. Выполняется в пуле потоков.
+    """
+    head = source.read(SNIFF_SIZE)
+    image_type = sniff_image_type(head)
+    if image_type is None:
+        raise _invalid_image()
+
+    content_hash = _content_hash()
+    with tempfile.NamedTemporaryFile(dir=UPLOAD_ROOT, prefix="direct-", delete=False) as target:
+        temp_path = Path(target.name)
+        try:
+            target.write(head)
+            content_hash.update(head)
+            size = len(head)
+            while chunk := source.read(settings.IMAGE_UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > MAX_IMAGE_SIZE:
+                    raise _image_too_large()
+                target.write(chunk)
+                content_hash.update(chunk)
+        except BaseException:
+            target.close()
+            temp_path.unlink(missing_ok=True)
+            raise
+    return media_storage.put(temp_path, content_hash.hexdigest(), image_type[1])
+
+
+async def save_product_image(file: UploadFile) -> str:
+    """
+    Сохраняет изображение товара и возвращает относительный URL.
+    Чтение и запись идут в пуле потоков, цикл событий не блокируется.
+    """
+    return await run_in_threadpool(_store_image_stream, file.file)
+
+
+def variant_path(file_name: str, variant: str) -> Path:
+    return VARIANT_ROOT / variant / f"{Path(file_name).stem}.webp"
+
+
+def image_variant_urls(image_url: str | None) -> dict[str, str] | None:
+    """
+    URL уменьшенных WebP-копий изображения товара по именам вариантов.
+    """
+    if not image_url:
+        return None
+    file_name = Path(image_url).name
+    return {
+        variant: f"{IMAGE_VARIANTS_URL}/{variant}/{file_name}"
+        for variant in settings.IMAGE_VARIANT_SIZES
+    }
+
+
+def delete_media_file(url: str, *, older_than: float | None = None) -> bool:
+    """
+    Удаляет файл изображения и его уменьшенные копии. Вызывается только
+    сборщиком (app.media_gc) в пуле потоков, запросы файлы не удаляют.
+    """
+    if not media_storage.delete(url, older_than=older_than):
+        return False
+    for variant in settings.IMAGE_VARIANT_SIZES:
+        variant_path(Path(url).name, variant).unlink(missing_ok=True)
+    return True
+
+
+# Возобновляемая загрузка: файл <id>.part с уже принятыми байтами
+# и <id>.json с владельцем и заявленным размером
+
+
+def _session_paths(upload_id: str) -> tuple[Path, Path]:
+    try:
+        normalized = uuid.UUID(upload_id).hex
+    except ValueError:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Upload not found")
+    return UPLOAD_ROOT / f"{normalized}.part", UPLOAD_ROOT / f"{normalized}.json"
+
+
+def _purge_expired_sessions() -> None:
+    deadline = time.time() - settings.IMAGE_UPLOAD_SESSION_TTL
+    for meta_path in UPLOAD_ROOT.glob("*.json"):
+        try:
+            if meta_path.stat().st_mtime < deadline:
+                meta_path.with_suffix(".part").unlink(missing_ok=True)
+                meta_path.unlink(missing_ok=True)
+        except FileNotFoundError:
+            continue
+
+
+def _create_session(owner_id: int, size: int) -> dict:
+    _purge_expired_sessions()
+    upload_id = uuid.uuid4().hex
+    part_path, meta_path = _session_paths(upload_id)
+    part_path.touch()
+    meta_path.write_text(json.dumps({"owner_id": owner_id, "size": size}))
+    return {"upload_id": upload_id, "size": size, "offset": 0, "complete": False}
+
+
+def _load_session(upload_id: str, owner_id: int) -> tuple[Path, Path, int, int]:
+    part_path, meta_path = _session_paths(upload_id)
+    try:
+        meta = json.loads(meta_path.read_text())
+        offset = part_path.stat().st_size
+    except FileNotFoundError:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Upload not found")
+    if meta["owner_id"] != owner_id:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Upload not found")
+    return part_path, meta_path, meta["size"], offset
+
+
+def _session_state(upload_id: str, owner_id: int) -> dict:
+    _, _, size, offset = _load_session(upload_id, owner_id)
+    return {"upload_id": upload_id, "size": size, "offset": offset, "complete": offset == size}
+
+
+def _open_part_locked(part_path: Path) -> BinaryIO:
+    """
+    Открывает файл загрузки на дозапись под эксклюзивной блокировкой:
+    параллельный PUT той же загрузки (в том числе из другого воркера) получает 409.
+    """
+    part = part_path.open("ab")
+    try:
+        fcntl.flock(part.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        part.close()
+        raise HTTPException(status.HTTP_409_CONFLICT, "Upload is in progress")
+    part.seek(0, os.SEEK_END)
+    return part
+
+
+async def create_upload_session(owner_id: int, size: int) -> dict:
+    """
+    Открывает возобновляемую загрузку изображения заявленного размера.
+    """
+    if size > MAX_IMAGE_SIZE:
+        raise _image_too_large()
+    return await run_in_threadpool(_create_session, owner_id, size)
+
+
+async def get_upload_session(upload_id: str, owner_id: int) -> dict:
+    return await run_in_threadpool(_session_state, upload_id, owner_id)
+
+
+async def append_upload_chunk(
+    upload_id: str, owner_id: int, offset: int, chunks: AsyncIterable[bytes]
+) -> dict:
+    """
+    Дописывает очередной кусок загрузки начиная с offset. offset должен совпадать
+    с числом уже принятых байт, иначе 409: клиент узнаёт текущее смещение через GET
+    и продолжает с него. Запись идёт в пуле потоков.
+    """
+    part_path, _, size, _ = await run_in_threadpool(_load_session, upload_id, owner_id)
+    part = await run_in_threadpool(_open_part_locked, part_path)
+    try:
+        current = part.tell()
+        if offset != current:
+            raise HTTPException(
+                status.HTTP_409_CONFLICT, f"Upload offset mismatch, expected {current}"
+            )
+        async for chunk in chunks:
+            if current + len(chunk) > size:
+                raise HTTPException(
+                    status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, "Chunk exceeds declared upload size"
+                )
+            await run_in_threadpool(part.write, chunk)
+            current += len(chunk)
+    finally:
+        await run_in_threadpool(part.close)
+    return {"upload_id": upload_id, "size": size, "offset": current, "complete": current == size}
+
+
+def _claim_session(upload_id: str, owner_id: int) -> str:
+    part_path, meta_path, size, offset = _load_session(upload_id, owner_id)
+    if offset != size:
+        raise HTTPException(status.HTTP_409_CONFLICT, "Upload is not complete")
+    with part_path.open("rb") as part:
+        image_type = sniff_image_type(part.read(SNIFF_SIZE))
+        if image_type is not None:
+            part.seek(0)
+            digest = hashlib.file_digest(part, _content_hash).hexdigest()
+    if image_type is None:
+        part_path.unlink(missing_ok=True)
+        meta_path.unlink(missing_ok=True)
+        raise _invalid_image()
+    try:
+        url = media_storage.put(part_path, digest, image_type[1])
+    except FileNotFoundError:
+        # Ту же загрузку уже забрал параллельный запрос
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Upload not found")
+    meta_path.unlink(missing_ok=True)
+    return url
+
+
+async def claim_uploaded_image(upload_id: str, owner_id: int) -> str:
+    """
+    Забирает завершённую загрузку как изображение товара: проверяет формат
+    по первым байтам и атомарно переносит файл в MEDIA_ROOT.
+    """
+    return await run_in_threadpool(_claim_session, upload_id, owner_id)
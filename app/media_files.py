@@ -0,0 +1,124 @@
+import mimetypes
+import os
+import stat
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from app.config import settings
+from app.media_storage import CONTENT_HASH_RE
+
+# Готовые сжатые копии рядом с файлом: <имя>.br, <имя>.gz; порядок задаёт предпочтение
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _accepted_encodings(accept_encoding: str) -> set[str]:
+    """
+    Кодировки из Accept-Encoding, кроме явно запрещённых через q=0.
+    """
+    accepted = set()
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        name, _, value = params.partition("=")
+        try:
+            if name.strip().lower() == "q" and float(value) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class MediaFiles(StaticFiles):
+    """
+    Раздача загруженных файлов из /media. Файлы никогда не перезаписываются
+    (имя строится из хэша содержимого), поэтому ответ помечается immutable
+    и кэшируется клиентом и прокси на MEDIA_CACHE_MAX_AGE: повторные просмотры
+    до приложения не доходят. Сильный ETag — сам хэш содержимого.
+
+    Запросы Range и If-Range обрабатывает FileResponse; если сервер поддерживает
+    расширение ASGI http.response.pathsend, файл отправляется без копирования
+    через Python. При заданном accel_redirect_prefix отправку файла выполняет
+    nginx по заголовку X-Accel-Redirect (sendfile, Range, сжатие gzip_static).
+    """
+
+    def __init__(
+        self,
+        *,
+        directory: str | os.PathLike[str],
+        precompressed: bool = False,
+        accel_redirect_prefix: str = "",
+    ):
+        super().__init__(directory=directory)
+        self.precompressed = precompressed
+        self.accel_redirect_prefix = accel_redirect_prefix.rstrip("/")
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if (
+            self.precompressed
+            and not self.accel_redirect_prefix
+            and scope["method"] in ("GET", "HEAD")
+        ):
+            request_headers = Headers(scope=scope)
+            # Диапазоны считаются по исходному файлу, сжатую копию для них не отдаём
+            if "range" not in request_headers:
+                accepted = _accepted_encodings(request_headers.get("accept-encoding", ""))
+                for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+                    if encoding not in accepted:
+                        continue
+                    try:
+                        full_path, stat_result = await anyio.to_thread.run_sync(
+                            self.lookup_path, path + suffix
+                        )
+                    except (OSError, ValueError):
+                        continue
+                    if stat_result and stat.S_ISREG(stat_result.st_mode):
+                        return self.file_response(
+                            full_path, stat_result, scope, content_encoding=encoding
+                        )
+        return await super().get_response(path, scope)
+
+    def file_response(
+        self,
+        full_path: str | os.PathLike[str],
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+        *,
+        content_encoding: str | None = None,
+    ) -> Response:
+        file_name = os.path.basename(full_path)
+        headers = {"cache-control": f"public, max-age={settings.MEDIA_CACHE_MAX_AGE}, immutable"}
+        if content_encoding is not None:
+            # Тип содержимого — по имени исходного файла без суффикса .br/.gz
+            file_name = os.path.splitext(file_name)[0]
+            headers["content-encoding"] = content_encoding
+        if self.precompressed:
+            headers["vary"] = "Accept-Encoding"
+        stem = os.path.splitext(file_name)[0]
+        if CONTENT_HASH_RE.fullmatch(stem):
+            suffix = f"-{content_encoding}" if content_encoding else ""
+            headers["etag"] = f'"{stem}{suffix}"'
+        media_type = mimetypes.guess_type(file_name)[0] or "application/octet-stream"
+
+        response = FileResponse(
+            full_path,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            stat_result=stat_result,
+        )
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        if self.accel_redirect_prefix:
+            relative_path = os.path.relpath(full_path, self.directory)
+            response.headers["x-accel-redirect"] = f"{self.accel_redirect_prefix}/{relative_path}"
+            # Тело отдаёт nginx, длину пустого ответа проставит Response
+            headers = {
+                name: value for name, value in response.headers.items() if name != "content-length"
+            }
+            return Response(status_code=status_code, headers=headers)
+        return response
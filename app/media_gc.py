@@ -0,0 +1,103 @@
+import time
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import case, delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session_maker
+from app.media import delete_media_file, media_storage
+from app.models.media import MediaBlobModel
+from app.models.products import ProductModel
+
+# Ключ pg_advisory_xact_lock: одновременно работает сборщик только одного воркера
+MEDIA_SWEEP_LOCK_ID = 0x6D65646961
+ORPHAN_CHECK_BATCH_SIZE = 500
+
+
+async def acquire_media(db: AsyncSession, url: str) -> None:
+    """
+    Учитывает новую ссылку товара на файл. Выполняется в транзакции записи товара:
+    при откате счётчик не меняется, а сам файл позже заберёт сборщик сирот.
+    """
+    statement = insert(MediaBlobModel).values(url=url, ref_count=1)
+    await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[MediaBlobModel.url],
+            set_={"ref_count": MediaBlobModel.ref_count + 1, "released_at": None},
+        )
+    )
+
+
+async def release_media(db: AsyncSession, url: str | None) -> None:
+    """
+    Снимает ссылку товара на файл. Файл удаляется не здесь, а сборщиком,
+    когда счётчик пробыл нулевым дольше MEDIA_ORPHAN_GRACE.
+    """
+    if not url:
+        return
+    await db.execute(
+        update(MediaBlobModel)
+        .where(MediaBlobModel.url == url)
+        .values(
+            ref_count=MediaBlobModel.ref_count - 1,
+            released_at=case((MediaBlobModel.ref_count <= 1, func.now())),
+        )
+    )
+
+
+async def _unreferenced(db: AsyncSession, urls: list[str]) -> list[str]:
+    """
+    URL из списка, которых нет ни в media_blobs, ни в image_url активных товаров.
+    """
+    known = set(await db.scalars(select(MediaBlobModel.url).where(MediaBlobModel.url.in_(urls))))
+    known.update(
+        url
+        for url in await db.scalars(
+            select(ProductModel.image_url).where(
+                ProductModel.image_url.in_(urls), ProductModel.is_active == True
+            )
+        )
+        if url is not None
+    )
+    return [url for url in urls if url not in known]
+
+
+async def sweep_media() -> int:
+    """
+    Один проход сборщика: удаляет файлы, счётчик ссылок которых давно равен нулю,
+    и файлы-сироты без записи в media_blobs (например, после отката транзакции
+    товара), если на них не ссылается ни один активный товар. Файлы моложе
+    MEDIA_ORPHAN_GRACE не трогаются. Возвращает число удалённых файлов.
+    """
+    cutoff = time.time() - settings.MEDIA_ORPHAN_GRACE
+    async with async_session_maker() as db:
+        if not await db.scalar(select(func.pg_try_advisory_xact_lock(MEDIA_SWEEP_LOCK_ID))):
+            return 0
+
+        released = await db.scalars(
+            delete(MediaBlobModel)
+            .where(
+                MediaBlobModel.ref_count <= 0,
+                MediaBlobModel.released_at < func.to_timestamp(cutoff),
+                ~select(ProductModel.id)
+                .where(ProductModel.image_url == MediaBlobModel.url, ProductModel.is_active == True)
+                .exists(),
+            )
+            .returning(MediaBlobModel.url)
+        )
+        stale = set(released)
+
+        candidates = await run_in_threadpool(lambda: list(media_storage.iter_urls(cutoff)))
+        for start in range(0, len(candidates), ORPHAN_CHECK_BATCH_SIZE):
+            batch = candidates[start : start + ORPHAN_CHECK_BATCH_SIZE]
+            stale.update(await _unreferenced(db, batch))
+        await db.commit()
+
+    removed = 0
+    for url in stale:
+        # Файл, загруженный заново во время прохода, свежее cutoff и остаётся
+        if await run_in_threadpool(delete_media_file, url, older_than=cutoff):
+            removed += 1
+    return removed
@@ -0,0 +1,97 @@
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+import os
+from pathlib import Path
+import re
+
+# Имя загруженного файла — хэш содержимого (blake2b, 16 байт) и расширение
+CONTENT_HASH_RE = re.compile(r"[0-9a-f]{32}")
+
+
+class MediaStorage(ABC):
+    """
+    Хранилище загруженных файлов с адресацией по содержимому: файл с тем же
+    хэшем сохраняется один раз, а ссылки на него считаются в таблице media_blobs.
+    Методы синхронные и вызываются из пула потоков.
+    """
+
+    url_prefix: str
+
+    @abstractmethod
+    def put(self, temp_path: Path, digest: str, extension: str) -> str:
+        """Забирает готовый временный файл и возвращает URL; дубликат не сохраняется."""
+
+    @abstractmethod
+    def local_path(self, file_name: str) -> Path:
+        """Путь к файлу на локальном диске (для рендера уменьшенных копий)."""
+
+    @abstractmethod
+    def delete(self, url: str, *, older_than: float | None = None) -> bool:
+        """Удаляет файл; с older_than — только если он не обновлялся после этого момента."""
+
+    @abstractmethod
+    def iter_urls(self, older_than: float) -> Iterator[str]:
+        """URL всех файлов, не обновлявшихся после older_than (для поиска сирот)."""
+
+
+class LocalMediaStorage(MediaStorage):
+    """
+    Файлы на локальном диске, разложенные по каталогам из первых символов хэша:
+    <root>/ab/cd/abcd….png. Так в одном каталоге остаётся немного файлов
+    даже при миллионах загрузок. Файлы со старыми uuid-именами лежат в корне.
+    """
+
+    def __init__(self, root: Path, url_prefix: str):
+        self.root = root
+        self.url_prefix = url_prefix
+
+    def _relative_path(self, file_name: str) -> str:
+        stem = Path(file_name).stem
+        if CONTENT_HASH_RE.fullmatch(stem):
+            return f"{stem[:2]}/{stem[2:4]}/{file_name}"
+        return file_name
+
+    def local_path(self, file_name: str) -> Path:
+        return self.root / self._relative_path(file_name)
+
+    def put(self, temp_path: Path, digest: str, extension: str) -> str:
+        file_name = f"{digest}{extension}"
+        target = self.local_path(file_name)
+        try:
+            # Файл уже есть: обновляем mtime, чтобы сборщик сирот не удалил его,
+            # пока новая ссылка на него ещё не зафиксирована в базе
+            os.utime(target)
+        except FileNotFoundError:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(temp_path, target)
+            # replace сохраняет mtime временного файла: возобновляемая загрузка,
+            # забранная через часы после последнего куска, иначе сразу старше
+            # порога сборщика сирот
+            os.utime(target)
+        else:
+            temp_path.unlink()
+        return f"{self.url_prefix}/{self._relative_path(file_name)}"
+
+    def delete(self, url: str, *, older_than: float | None = None) -> bool:
+        path = self.local_path(Path(url).name)
+        try:
+            if older_than is not None and path.stat().st_mtime >= older_than:
+                return False
+            path.unlink()
+        except FileNotFoundError:
+            return False
+        return True
+
+    def iter_urls(self, older_than: float) -> Iterator[str]:
+        for directory, _, file_names in os.walk(self.root):
+            relative_dir = os.path.relpath(directory, self.root)
+            for file_name in file_names:
+                try:
+                    mtime = os.stat(os.path.join(directory, file_name)).st_mtime
+                except FileNotFoundError:
+                    continue
+                if mtime < older_than:
+                    relative_path = (
+                        file_name if relative_dir == "." else f"{relative_dir}/{file_name}"
+                    )
+                    yield f"{self.url_prefix}/{relative_path}"
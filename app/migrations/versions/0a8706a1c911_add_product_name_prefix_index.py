@@ -0,0 +1,35 @@
+"""add product name prefix index
+
+Revision ID: 0a8706a1c911
+Revises: f1d71a2a412c
+Create Date: 2026-10-18 19:52:11.204381
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a8706a1c911'
+down_revision: Union[str, Sequence[str], None] = 'f1d71a2a412c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_products_name_prefix_gin',
+        'products',
+        [sa.text("to_tsvector('simple', name)")],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_where=sa.text('is_active'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_name_prefix_gin', table_name='products', postgresql_using='gin')
@@ -0,0 +1,37 @@
+"""add product name trigram index
+
+Revision ID: 3c5e81d2f7a4
+Revises: 0a8706a1c911
+Create Date: 2026-10-18 20:14:37.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c5e81d2f7a4'
+down_revision: Union[str, Sequence[str], None] = '0a8706a1c911'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_products_name_trgm',
+        'products',
+        ['name'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_name_trgm', table_name='products', postgresql_using='gin')
+    # Расширение pg_trgm не удаляем: им могут пользоваться другие объекты базы
@@ -0,0 +1,39 @@
+"""add partial indexes for active products and reviews
+
+Revision ID: 9d4b27e6c150
+Revises: 3c5e81d2f7a4
+Create Date: 2026-10-18 20:31:05.702913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4b27e6c150'
+down_revision: Union[str, Sequence[str], None] = '3c5e81d2f7a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    active = sa.text('is_active')
+    op.create_index('ix_products_active_category_id', 'products', ['category_id', 'id'], unique=False, postgresql_where=active)
+    op.create_index('ix_products_active_created_at', 'products', ['created_at', 'id'], unique=False, postgresql_where=active)
+    op.create_index('ix_products_active_price', 'products', ['price'], unique=False, postgresql_where=active)
+    op.create_index('ix_products_active_seller_id', 'products', ['seller_id', 'id'], unique=False, postgresql_where=active)
+    op.create_index('ix_products_active_in_stock', 'products', ['id'], unique=False, postgresql_where=sa.text('is_active AND stock > 0'))
+    op.create_index('ix_reviews_active_product_id', 'reviews', ['product_id'], unique=False, postgresql_where=active)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_reviews_active_product_id', table_name='reviews')
+    op.drop_index('ix_products_active_in_stock', table_name='products')
+    op.drop_index('ix_products_active_seller_id', table_name='products')
+    op.drop_index('ix_products_active_price', table_name='products')
+    op.drop_index('ix_products_active_created_at', table_name='products')
+    op.drop_index('ix_products_active_category_id', table_name='products')
@@ -0,0 +1,29 @@
+"""drop products updated_at index
+
+Revision ID: b2d8e5f1a3c7
+Revises: f7b2c4d81e36
+Create Date: 2026-10-19 15:02:11.847310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2d8e5f1a3c7'
+down_revision: Union[str, Sequence[str], None] = 'f7b2c4d81e36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Валидаторы списков строятся по строкам страницы, max(updated_at) больше не запрашивается
+    op.drop_index('ix_products_updated_at', table_name='products')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_products_updated_at', 'products', ['updated_at'], unique=False)
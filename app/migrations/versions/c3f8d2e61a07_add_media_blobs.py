@@ -0,0 +1,46 @@
+"""add media blobs
+
+Revision ID: c3f8d2e61a07
+Revises: e4c1f08a9b52
+Create Date: 2026-10-18 23:58:11.204715
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f8d2e61a07'
+down_revision: Union[str, Sequence[str], None] = 'e4c1f08a9b52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('media_blobs',
+    sa.Column('url', sa.String(length=200), nullable=False),
+    sa.Column('ref_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('released_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('url')
+    )
+    op.create_index('ix_media_blobs_released_at', 'media_blobs', ['released_at'], unique=False, postgresql_where=sa.text('ref_count <= 0'))
+
+    # Счётчики ссылок для изображений уже существующих активных товаров
+    op.execute(
+        """
+        INSERT INTO media_blobs (url, ref_count)
+        SELECT image_url, count(*) FROM products
+        WHERE image_url IS NOT NULL AND is_active
+        GROUP BY image_url
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_media_blobs_released_at', table_name='media_blobs', postgresql_where=sa.text('ref_count <= 0'))
+    op.drop_table('media_blobs')
@@ -0,0 +1,47 @@
+"""add product review aggregates
+
+Revision ID: d5a0b3c9e812
+Revises: c3f8d2e61a07
+Create Date: 2026-10-19 00:41:27.630914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a0b3c9e812'
+down_revision: Union[str, Sequence[str], None] = 'c3f8d2e61a07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('products', sa.Column('review_count', sa.Integer(), server_default=sa.text('0'), nullable=False))
+    op.add_column('products', sa.Column('rating_sum', sa.Integer(), server_default=sa.text('0'), nullable=False))
+
+    # Начальные значения из активных отзывов
+    op.execute(
+        """
+        UPDATE products
+        SET review_count = aggregates.review_count,
+            rating_sum = aggregates.rating_sum,
+            rating = aggregates.rating_sum::float / aggregates.review_count
+        FROM (
+            SELECT product_id, count(*) AS review_count, sum(grade) AS rating_sum
+            FROM reviews
+            WHERE is_active
+            GROUP BY product_id
+        ) AS aggregates
+        WHERE products.id = aggregates.product_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('products', 'rating_sum')
+    op.drop_column('products', 'review_count')
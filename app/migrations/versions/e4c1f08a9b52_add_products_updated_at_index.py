@@ -0,0 +1,28 @@
+"""add products updated_at index
+
+Revision ID: e4c1f08a9b52
+Revises: b7e2a9c4d831
+Create Date: 2026-10-18 23:12:40.518306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4c1f08a9b52'
+down_revision: Union[str, Sequence[str], None] = 'b7e2a9c4d831'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_products_updated_at', 'products', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_updated_at', table_name='products')
@@ -0,0 +1,61 @@
+"""add review feed indexes and grade counts
+
+Revision ID: f7b2c4d81e36
+Revises: d5a0b3c9e812
+Create Date: 2026-10-19 01:37:02.418553
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7b2c4d81e36'
+down_revision: Union[str, Sequence[str], None] = 'd5a0b3c9e812'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    active = sa.text('is_active')
+    # Индекс ленты товара начинается с product_id и заменяет ix_reviews_active_product_id
+    op.create_index('ix_reviews_active_product_feed', 'reviews', ['product_id', 'comment_date', 'id'], unique=False, postgresql_where=active)
+    op.create_index('ix_reviews_active_feed', 'reviews', ['comment_date', 'id'], unique=False, postgresql_where=active)
+    op.drop_index('ix_reviews_active_product_id', table_name='reviews')
+
+    op.add_column('products', sa.Column('grade_counts', postgresql.ARRAY(sa.Integer()), server_default=sa.text("'{0,0,0,0,0}'"), nullable=False))
+    # Начальная гистограмма из активных отзывов
+    op.execute(
+        """
+        UPDATE products
+        SET grade_counts = histogram.grade_counts
+        FROM (
+            SELECT product_id,
+                   ARRAY[
+                       count(*) FILTER (WHERE grade = 1),
+                       count(*) FILTER (WHERE grade = 2),
+                       count(*) FILTER (WHERE grade = 3),
+                       count(*) FILTER (WHERE grade = 4),
+                       count(*) FILTER (WHERE grade = 5)
+                   ]::integer[] AS grade_counts
+            FROM reviews
+            WHERE is_active
+            GROUP BY product_id
+        ) AS histogram
+        WHERE products.id = histogram.product_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('products', 'grade_counts')
+
+    active = sa.text('is_active')
+    op.create_index('ix_reviews_active_product_id', 'reviews', ['product_id'], unique=False, postgresql_where=active)
+    op.drop_index('ix_reviews_active_feed', table_name='reviews')
+    op.drop_index('ix_reviews_active_product_feed', table_name='reviews')
@@ -1,5 +1,6 @@
 from .cart_items import CartItemModel
-from .categories import CategoryModel
+from .categories import CategoryClosureModel, CategoryModel
+from .media import MediaBlobModel
 from .orders import OrderItemModel, OrderModel
 from .products import ProductModel
 from .reviews import ReviewModel
@@ -7,10 +8,12 @@ from .users import UserModel
 
 __all__ = [
     "CategoryModel",
+    "CategoryClosureModel",
     "ProductModel",
     "UserModel",
     "ReviewModel",
     "CartItemModel",
     "OrderModel",
     "OrderItemModel",
+    "MediaBlobModel",
 ]
@@ -1,6 +1,6 @@
 from typing import Optional
 
-from sqlalchemy import Boolean, ForeignKey, String
+from sqlalchemy import Boolean, ForeignKey, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -20,3 +20,20 @@ class CategoryModel(Base):
         "CategoryModel", back_populates="children", remote_side="CategoryModel.id"
     )
     children: Mapped[list["CategoryModel"]] = relationship("CategoryModel", back_populates="parent")
+
+
+class CategoryClosureModel(Base):
+    """
+    Транзитивное замыкание дерева категорий: строка (ancestor, descendant, depth)
+    на каждую пару «предок — потомок», включая саму категорию с depth = 0.
+    """
+
+    __tablename__ = "category_closure"
+
+    ancestor_id: Mapped[int] = mapped_column(
+        ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True
+    )
+    descendant_id: Mapped[int] = mapped_column(
+        ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    depth: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, Integer, String, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class MediaBlobModel(Base):
+    """
+    Файл хранилища изображений и число товаров, которые на него ссылаются.
+    Файл с нулевым счётчиком удаляет сборщик (app.media_gc) после MEDIA_ORPHAN_GRACE.
+    """
+
+    __tablename__ = "media_blobs"
+
+    url: Mapped[str] = mapped_column(String(200), primary_key=True)
+    ref_count: Mapped[int] = mapped_column(
+        Integer, default=0, server_default=text("0"), nullable=False
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    # Момент, когда счётчик опустился до нуля
+    released_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_media_blobs_released_at", "released_at", postgresql_where=text("ref_count <= 0")),
+    )
@@ -13,7 +13,7 @@ from sqlalchemy import (
     String,
     func,
 )
-from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import text
 
@@ -35,6 +35,18 @@ class ProductModel(Base):
     rating: Mapped[float] = mapped_column(
         Float, default=0.0, server_default=text("0.0"), nullable=False
     )
+    # Число и сумма оценок активных отзывов: rating = rating_sum / review_count.
+    # Меняются приращениями вместе с записью отзыва (app.ratings)
+    review_count: Mapped[int] = mapped_column(
+        Integer, default=0, server_default=text("0"), nullable=False
+    )
+    rating_sum: Mapped[int] = mapped_column(
+        Integer, default=0, server_default=text("0"), nullable=False
+    )
+    # Гистограмма оценок: grade_counts[grade] — число активных отзывов с оценкой grade (1-5)
+    grade_counts: Mapped[list[int]] = mapped_column(
+        ARRAY(Integer), server_default=text("'{0,0,0,0,0}'"), nullable=False
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -61,4 +73,37 @@ class ProductModel(Base):
     )
     order_items: Mapped[list["OrderItemModel"]] = relationship("OrderItemModel", back_populates="product")
 
-    __table_args__ = (Index("ix_products_tsv_gin", "tsv", postgresql_using="gin"),)
+    __table_args__ = (
+        Index("ix_products_tsv_gin", "tsv", postgresql_using="gin"),
+        # Префиксный поиск по названию для автодополнения (GET /products/suggest)
+        Index(
+            "ix_products_name_prefix_gin",
+            text("to_tsvector('simple', name)"),
+            postgresql_using="gin",
+            postgresql_where=text("is_active"),
+        ),
+        # Нечёткий поиск по названию (pg_trgm), если полнотекстовый ничего не нашёл
+        Index(
+            "ix_products_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        # Частичные индексы под фильтры и сортировки каталога (только активные товары)
+        Index(
+            "ix_products_active_category_id",
+            "category_id",
+            "id",
+            postgresql_where=text("is_active"),
+        ),
+        Index(
+            "ix_products_active_created_at", "created_at", "id", postgresql_where=text("is_active")
+        ),
+        Index("ix_products_active_price", "price", postgresql_where=text("is_active")),
+        Index(
+            "ix_products_active_seller_id", "seller_id", "id", postgresql_where=text("is_active")
+        ),
+        Index(
+            "ix_products_active_in_stock", "id", postgresql_where=text("is_active AND stock > 0")
+        ),
+    )
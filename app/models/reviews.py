@@ -9,7 +9,7 @@
 # is_active: Булево поле, по умолчанию True (для мягкого удаления).
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Text, func
+from sqlalchemy import DateTime, ForeignKey, Index, Text, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -29,3 +29,15 @@ class ReviewModel(Base):
 
     user: Mapped["UserModel"] = relationship("UserModel", back_populates="reviews")
     product: Mapped["ProductModel"] = relationship("ProductModel", back_populates="reviews")
+
+    __table_args__ = (
+        # Ленты отзывов: keyset-пагинация по (comment_date, id), новые первыми
+        Index(
+            "ix_reviews_active_product_feed",
+            "product_id",
+            "comment_date",
+            "id",
+            postgresql_where=text("is_active"),
+        ),
+        Index("ix_reviews_active_feed", "comment_date", "id", postgresql_where=text("is_active")),
+    )
@@ -0,0 +1,104 @@
+import asyncio
+import base64
+import binascii
+from collections.abc import Coroutine
+from enum import StrEnum
+import json
+from typing import Any
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session_maker
+
+
+def encode_cursor(kind: str, values: list[Any]) -> str:
+    """
+    Упаковывает ключ последней строки страницы в непрозрачный курсор.
+    kind — режим сортировки, для которого курсор действителен.
+    """
+    raw = json.dumps({"k": kind, "v": values}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _load_cursor(cursor: str) -> dict[str, Any]:
+    invalid_cursor = HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise invalid_cursor
+    if not isinstance(data, dict) or not isinstance(data.get("v"), list):
+        raise invalid_cursor
+    return data
+
+
+def cursor_kind(cursor: str) -> str | None:
+    """
+    Возвращает режим сортировки, для которого выдан курсор.
+    """
+    return _load_cursor(cursor).get("k")
+
+
+def decode_cursor(cursor: str, kind: str) -> list[Any]:
+    """
+    Распаковывает курсор и проверяет, что он выдан для того же режима сортировки.
+    """
+    data = _load_cursor(cursor)
+    if data.get("k") != kind:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return data["v"]
+
+
+class TotalMode(StrEnum):
+    """
+    Способ подсчёта общего количества строк в списке.
+    """
+
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    NONE = "none"
+
+
+async def count_exact(filtered_stmt: Select) -> int:
+    """
+    Точный COUNT(*) по тем же фильтрам, что и страница.
+    Выполняется в отдельной сессии, чтобы идти параллельно с запросом страницы.
+    """
+    count_stmt = filtered_stmt.with_only_columns(func.count(), maintain_column_froms=True)
+    async with async_session_maker() as session:
+        return await session.scalar(count_stmt) or 0
+
+
+async def count_estimated(db: AsyncSession, filtered_stmt: Select) -> int:
+    """
+    Оценка количества строк по плану запроса (EXPLAIN) без выполнения самого запроса.
+    """
+    conn = await db.connection()
+    compiled = filtered_stmt.compile(dialect=conn.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup or ())
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params)
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def fetch_with_total(
+    db: AsyncSession, filtered_stmt: Select, mode: TotalMode, fetch_page: Coroutine[Any, Any, Any]
+) -> tuple[Any, int | None]:
+    """
+    Загружает страницу и общее количество строк выбранным способом.
+    В режиме exact подсчёт идёт на втором соединении одновременно со страницей.
+    """
+    if mode == TotalMode.EXACT:
+        async with asyncio.TaskGroup() as tg:
+            total_task = tg.create_task(count_exact(filtered_stmt))
+            page_task = tg.create_task(fetch_page)
+        return page_task.result(), total_task.result()
+
+    page = await fetch_page
+    if mode == TotalMode.ESTIMATED:
+        return page, await count_estimated(db, filtered_stmt)
+    return page, None
@@ -0,0 +1,126 @@
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import logging
+import math
+import time
+from typing import Any
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class PasswordHasherStats:
+    """
+    Счётчики пула хеширования с момента запуска воркера.
+    Время — суммарное, в секундах; среднее считается при выдаче метрик.
+    """
+
+    completed: int = 0
+    rejected: int = 0
+    wait_seconds: float = 0.0
+    hash_seconds: float = 0.0
+    max_hash_seconds: float = 0.0
+
+
+class PasswordHasher:
+    """
+    Хеширование и проверка паролей bcrypt в отдельном пуле потоков: bcrypt
+    отпускает GIL, поэтому вход и регистрация не останавливают цикл событий.
+    Одновременно считается не больше PASSWORD_HASH_WORKERS хешей, в очереди ждут
+    не больше PASSWORD_HASH_MAX_QUEUE запросов и не дольше
+    PASSWORD_HASH_QUEUE_TIMEOUT; остальным сразу отвечаем 503 с Retry-After.
+    """
+
+    def __init__(self, workers: int, max_queue: int, queue_timeout: float):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.stats = PasswordHasherStats()
+        self._pool: ThreadPoolExecutor | None = None
+        self._slots = asyncio.Semaphore(workers)
+        self._queued = 0
+        self._in_flight = 0
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="password-hash"
+            )
+        return self._pool
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _reject(self, reason: str) -> HTTPException:
+        self.stats.rejected += 1
+        logger.warning("Password hashing request rejected: %s", reason)
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication is temporarily overloaded, try again later",
+            headers={"Retry-After": str(math.ceil(self.queue_timeout))},
+        )
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Выполняет func(*args) в пуле. HTTPException 503, если очередь заполнена
+        или свободный поток не появился за PASSWORD_HASH_QUEUE_TIMEOUT.
+        """
+        if self._slots.locked() and self._queued >= self.max_queue:
+            raise self._reject("queue is full")
+
+        queued_at = time.perf_counter()
+        self._queued += 1
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await self._slots.acquire()
+        except TimeoutError:
+            raise self._reject("queue timeout") from None
+        finally:
+            self._queued -= 1
+
+        started_at = time.perf_counter()
+        self._in_flight += 1
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._get_pool().submit(func, *args)
+        except BaseException:
+            self._done(queued_at, started_at)
+            raise
+        # Поток освобождается только когда bcrypt действительно закончил,
+        # даже если клиент отключился и запрос отменён раньше
+        future.add_done_callback(
+            lambda _: loop.call_soon_threadsafe(self._done, queued_at, started_at)
+        )
+        return await asyncio.wrap_future(future)
+
+    def _done(self, queued_at: float, started_at: float) -> None:
+        self._in_flight -= 1
+        self._slots.release()
+        elapsed = time.perf_counter() - started_at
+        self.stats.completed += 1
+        self.stats.wait_seconds += started_at - queued_at
+        self.stats.hash_seconds += elapsed
+        self.stats.max_hash_seconds = max(self.stats.max_hash_seconds, elapsed)
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    queue_timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT,
+)
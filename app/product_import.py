@@ -0,0 +1,291 @@
+import codecs
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator
+import csv
+import json
+from typing import Any
+
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.category_registry import category_registry
+from app.config import settings
+from app.schemas.products import ProductCreateSchema
+
+STAGING_TABLE = "products_import_staging"
+STAGING_COLUMNS = ("row_number", "name", "description", "price", "stock", "category_id")
+
+
+class ImportTooLargeError(Exception):
+    """Файл импорта содержит больше строк, чем IMPORT_MAX_ROWS."""
+
+
+async def _iter_lines(body: AsyncIterable[bytes]) -> AsyncIterator[str | None]:
+    """
+    Разбивает поток байтов на строки, не загружая тело запроса в память целиком.
+    Строка длиннее IMPORT_MAX_LINE_LENGTH не накапливается: вместо неё выдаётся None.
+    """
+    limit = settings.IMPORT_MAX_LINE_LENGTH
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    tail = ""
+    overflow = False
+    async for chunk in body:
+        tail += decoder.decode(chunk)
+        *lines, tail = tail.split("\n")
+        for line in lines:
+            if overflow or len(line) > limit:
+                overflow = False
+                yield None
+            else:
+                yield line
+        if len(tail) > limit:
+            # Остаток длинной строки пропускаем до следующего перевода строки
+            overflow = True
+            tail = ""
+    tail += decoder.decode(b"", final=True)
+    if overflow or len(tail) > limit:
+        yield None
+    elif tail:
+        yield tail
+
+
+class _NeedMoreInputError(Exception):
+    """Запись CSV продолжается в строках, которые ещё не прочитаны из тела запроса."""
+
+
+class _CsvLineBuffer:
+    """
+    Источник строк для csv.reader поверх асинхронного потока. csv.reader читает
+    синхронно, поэтому строки подкладываются по одной; если запись (поле в кавычках
+    на нескольких строках) продолжается дальше прочитанного, её строки
+    возвращаются в буфер и разбор повторяется, когда придёт следующая строка.
+    Длина одной записи ограничена IMPORT_MAX_RECORD_LENGTH.
+    """
+
+    def __init__(self):
+        self.pending: deque[str | None] = deque()
+        self.exhausted = False
+        self._record: list[str] = []
+        self._record_length = 0
+
+    def __iter__(self) -> "_CsvLineBuffer":
+        return self
+
+    def __next__(self) -> str:
+        if not self.pending:
+            if self.exhausted:
+                raise StopIteration
+            raise _NeedMoreInputError
+        line = self.pending.popleft()
+        if line is None:
+            self.end_record()
+            raise csv.Error(f"line is longer than {settings.IMPORT_MAX_LINE_LENGTH} characters")
+        self._record.append(line)
+        self._record_length += len(line)
+        if self._record_length > settings.IMPORT_MAX_RECORD_LENGTH:
+            self.end_record()
+            raise csv.Error(f"record is longer than {settings.IMPORT_MAX_RECORD_LENGTH} characters")
+        # csv.reader переносит перевод строки внутрь поля в кавычках, только если он есть
+        return f"{line}\n"
+
+    def end_record(self) -> None:
+        self._record.clear()
+        self._record_length = 0
+
+    def rewind(self) -> None:
+        self.pending.extendleft(reversed(self._record))
+        self.end_record()
+
+
+async def _iter_csv_records(
+    body: AsyncIterable[bytes],
+) -> AsyncIterator[tuple[list[str] | None, str | None]]:
+    """
+    Разбирает CSV одним csv.reader и выдаёт (поля записи, None) или (None, ошибка разбора).
+    Ошибка csv.Error относится к одной записи: разбор продолжается со следующей строки.
+    """
+    buffer = _CsvLineBuffer()
+    reader = csv.reader(buffer)
+    lines = aiter(_iter_lines(body))
+    while True:
+        try:
+            record = next(reader)
+        except _NeedMoreInputError:
+            buffer.rewind()
+            try:
+                buffer.pending.append(await anext(lines))
+            except StopAsyncIteration:
+                buffer.exhausted = True
+            continue
+        except StopIteration:
+            return
+        except csv.Error as exc:
+            buffer.end_record()
+            yield None, f"Invalid CSV: {exc}"
+            continue
+        buffer.end_record()
+        if record:
+            yield record, None
+
+
+async def iter_import_rows(
+    body: AsyncIterable[bytes], feed_format: str
+) -> AsyncIterator[tuple[int, dict[str, Any] | None, str | None]]:
+    """
+    Выдаёт строки файла импорта как (номер строки данных, поля, ошибка разбора).
+    CSV должен начинаться со строки заголовка с именами полей ProductCreateSchema.
+    """
+    row_number = 0
+    if feed_format == "csv":
+        header: list[str] | None = None
+        async for record, csv_error in _iter_csv_records(body):
+            # Запись без полей — ошибка разбора в csv_error
+            if record is None:
+                row_number += 1
+                yield row_number, None, csv_error
+                continue
+            if header is None:
+                header = [name.strip() for name in record]
+                continue
+            row_number += 1
+            if len(record) != len(header):
+                yield row_number, None, f"Expected {len(header)} columns, got {len(record)}"
+                continue
+            # Пустая ячейка CSV означает отсутствие значения
+            yield row_number, {k: v for k, v in zip(header, record, strict=True) if v != ""}, None
+        return
+
+    async for line in _iter_lines(body):
+        if line is None:
+            row_number += 1
+            yield (
+                row_number,
+                None,
+                f"Line is longer than {settings.IMPORT_MAX_LINE_LENGTH} characters",
+            )
+            continue
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            data = json.loads(line)
+        except ValueError as exc:
+            yield row_number, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(data, dict):
+            yield row_number, None, "Expected a JSON object"
+            continue
+        yield row_number, data, None
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+    )
+
+
+async def _copy_to_staging(db: AsyncSession, records: list[tuple]) -> None:
+    """
+    Загружает пачку проверенных строк во временную таблицу через COPY (asyncpg).
+    """
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver_connection = raw_connection.driver_connection
+    if driver_connection is None:
+        raise RuntimeError("Database connection is closed")
+    await driver_connection.copy_records_to_table(
+        STAGING_TABLE, records=records, columns=STAGING_COLUMNS
+    )
+
+
+async def import_products(
+    db: AsyncSession, body: AsyncIterable[bytes], feed_format: str, seller_id: int
+) -> dict[str, Any]:
+    """
+    Импортирует товары продавца без commit: строки проверяются ProductCreateSchema
+    пачками, корректные копируются через COPY во временную таблицу и затем одним
+    INSERT ... SELECT переносятся в products. Ошибочные строки попадают в отчёт
+    и не прерывают загрузку.
+    """
+    await db.execute(
+        text(
+            f"""
+            CREATE TEMP TABLE {STAGING_TABLE} (
+                row_number integer NOT NULL,
+                name varchar(100) NOT NULL,
+                description varchar(500),
+                price numeric(10, 2) NOT NULL,
+                stock integer NOT NULL,
+                category_id integer NOT NULL
+            ) ON COMMIT DROP
+            """
+        )
+    )
+
+    errors: list[dict[str, Any]] = []
+    category_ids: set[int] = set()
+    batch: list[tuple] = []
+    imported = 0
+    total = 0
+
+    async for row_number, data, parse_error in iter_import_rows(body, feed_format):
+        total += 1
+        if total > settings.IMPORT_MAX_ROWS:
+            raise ImportTooLargeError
+        if parse_error is not None:
+            errors.append({"row": row_number, "message": parse_error})
+            continue
+        try:
+            product = ProductCreateSchema.model_validate(data)
+        except ValidationError as exc:
+            errors.append({"row": row_number, "message": _validation_message(exc)})
+            continue
+        if not await category_registry.is_active(db, product.category_id):
+            errors.append({"row": row_number, "message": "Category not found or inactive"})
+            continue
+
+        category_ids.add(product.category_id)
+        batch.append(
+            (
+                row_number,
+                product.name,
+                product.description,
+                product.price,
+                product.stock,
+                product.category_id,
+            )
+        )
+        if len(batch) >= settings.IMPORT_BATCH_SIZE:
+            await _copy_to_staging(db, batch)
+            imported += len(batch)
+            batch = []
+
+    if batch:
+        await _copy_to_staging(db, batch)
+        imported += len(batch)
+
+    product_ids: list[int] = []
+    if imported:
+        result = await db.execute(
+            text(
+                f"""
+                INSERT INTO products
+                    (name, description, price, stock, category_id, seller_id, is_active)
+                SELECT name, description, price, stock, category_id, :seller_id, true
+                FROM {STAGING_TABLE}
+                ORDER BY row_number
+                RETURNING id
+                """
+            ),
+            {"seller_id": seller_id},
+        )
+        product_ids = list(result.scalars())
+
+    return {
+        "imported": imported,
+        "failed": len(errors),
+        "errors": errors,
+        "category_ids": sorted(category_ids),
+        "product_ids": product_ids,
+    }
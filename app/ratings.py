@@ -0,0 +1,210 @@
+from typing import Any
+
+from sqlalchemy import (
+    ColumnElement,
+    Float,
+    Integer,
+    Subquery,
+    Text,
+    and_,
+    case,
+    cast,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    true,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, array
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import listing_cache, product_cache, product_tag
+from app.config import settings
+from app.database import async_engine
+from app.models.products import ProductModel
+from app.models.reviews import ReviewModel
+
+# Ключ pg_advisory_lock: сверку выполняет только один воркер
+RATING_RECONCILE_LOCK_ID = 0x726174696E67
+# Допустимые оценки; products.grade_counts[grade] хранит число отзывов с оценкой grade
+GRADES = range(1, 6)
+
+
+def _average(rating_sum: ColumnElement, review_count: ColumnElement) -> ColumnElement:
+    return case((review_count > 0, cast(rating_sum, Float) / cast(review_count, Float)), else_=0.0)
+
+
+def _apply_delta(grade: ColumnElement, sign: int) -> dict[Any, ColumnElement]:
+    """
+    Значения SET для products при добавлении (sign=1) или снятии (sign=-1) оценки:
+    число и сумма оценок, рейтинг и ячейка гистограммы grade_counts[grade].
+    В правой части SET видны старые значения строки, поэтому rating считается
+    от уже изменённых сумм явно.
+    """
+    review_count = ProductModel.review_count + sign
+    rating_sum = ProductModel.rating_sum + sign * grade
+    return {
+        ProductModel.review_count: review_count,
+        ProductModel.rating_sum: rating_sum,
+        ProductModel.rating: _average(rating_sum, review_count),
+        ProductModel.grade_counts[grade]: ProductModel.grade_counts[grade] + sign,
+    }
+
+
+async def add_review(
+    db: AsyncSession, user_id: int, product_id: int, comment: str | None, grade: int
+) -> dict[str, Any] | None:
+    """
+    Создаёт отзыв и прибавляет оценку к агрегатам товара одним запросом
+    (INSERT в CTE + UPDATE products), без commit. Строка товара блокируется
+    только на время этого UPDATE. None, если товар не найден или неактивен.
+    """
+    new_review = (
+        insert(ReviewModel)
+        .from_select(
+            ["user_id", "product_id", "comment", "grade", "is_active"],
+            select(
+                literal(user_id),
+                ProductModel.id,
+                literal(comment, Text),
+                literal(grade),
+                true(),
+            ).where(ProductModel.id == product_id, ProductModel.is_active == True),
+        )
+        .returning(*ReviewModel.__table__.c)
+        .cte("new_review")
+    )
+    result = await db.execute(
+        update(ProductModel)
+        .where(ProductModel.id == new_review.c.product_id)
+        .values(_apply_delta(new_review.c.grade, 1))
+        .returning(*new_review.c)
+    )
+    row = result.mappings().first()
+    return dict(row) if row is not None else None
+
+
+async def deactivate_review(db: AsyncSession, review_id: int) -> int | None:
+    """
+    Мягко удаляет отзыв и вычитает его оценку из агрегатов товара одним запросом,
+    без commit. Возвращает ID товара или None, если отзыв уже неактивен.
+    """
+    removed_review = (
+        update(ReviewModel)
+        .where(ReviewModel.id == review_id, ReviewModel.is_active == True)
+        .values(is_active=False)
+        .returning(ReviewModel.product_id, ReviewModel.grade)
+        .cte("removed_review")
+    )
+    result = await db.execute(
+        update(ProductModel)
+        .where(ProductModel.id == removed_review.c.product_id)
+        .values(_apply_delta(removed_review.c.grade, -1))
+        .returning(ProductModel.id)
+    )
+    return result.scalar()
+
+
+def _actual_aggregates(product_ids: ColumnElement) -> Subquery:
+    """
+    Фактические число, сумма и гистограмма оценок активных отзывов для выбранных товаров.
+    """
+    return (
+        select(
+            ProductModel.id.label("product_id"),
+            func.count(ReviewModel.id).label("review_count"),
+            func.coalesce(func.sum(ReviewModel.grade), 0).label("rating_sum"),
+            # count() возвращает bigint, а столбец — integer[]
+            cast(
+                array(
+                    [
+                        func.count(ReviewModel.id).filter(ReviewModel.grade == grade)
+                        for grade in GRADES
+                    ]
+                ),
+                ARRAY(Integer),
+            ).label("grade_counts"),
+        )
+        .outerjoin(
+            ReviewModel,
+            and_(ReviewModel.product_id == ProductModel.id, ReviewModel.is_active == True),
+        )
+        .where(product_ids)
+        .group_by(ProductModel.id)
+        .subquery("actual")
+    )
+
+
+def _drifted(actual: Subquery) -> ColumnElement:
+    return and_(
+        ProductModel.id == actual.c.product_id,
+        or_(
+            ProductModel.review_count != actual.c.review_count,
+            ProductModel.rating_sum != actual.c.rating_sum,
+            ProductModel.grade_counts != actual.c.grade_counts,
+        ),
+    )
+
+
+async def reconcile_product_ratings() -> int:
+    """
+    Сверяет агрегаты оценок всех товаров с отзывами пачками по RATING_RECONCILE_BATCH_SIZE
+    и исправляет расхождения. Пачка сначала проверяется без блокировок; товары
+    с расхождением блокируются FOR UPDATE и пересчитываются уже под блокировкой,
+    чтобы не затереть приращения параллельных записей отзывов.
+    Возвращает число исправленных товаров.
+    """
+    fixed: list[int] = []
+    async with async_engine.connect() as conn:
+        if not await conn.scalar(select(func.pg_try_advisory_lock(RATING_RECONCILE_LOCK_ID))):
+            return 0
+        try:
+            last_id = 0
+            while True:
+                batch = list(
+                    await conn.scalars(
+                        select(ProductModel.id)
+                        .where(ProductModel.id > last_id)
+                        .order_by(ProductModel.id)
+                        .limit(settings.RATING_RECONCILE_BATCH_SIZE)
+                    )
+                )
+                if not batch:
+                    break
+                last_id = batch[-1]
+
+                actual = _actual_aggregates(ProductModel.id.between(batch[0], last_id))
+                drifted = list(await conn.scalars(select(ProductModel.id).where(_drifted(actual))))
+                if drifted:
+                    await conn.execute(
+                        select(ProductModel.id)
+                        .where(ProductModel.id.in_(drifted))
+                        .with_for_update()
+                    )
+                    actual = _actual_aggregates(ProductModel.id.in_(drifted))
+                    result = await conn.execute(
+                        update(ProductModel)
+                        .where(_drifted(actual))
+                        .values(
+                            review_count=actual.c.review_count,
+                            rating_sum=actual.c.rating_sum,
+                            grade_counts=actual.c.grade_counts,
+                            rating=_average(actual.c.rating_sum, actual.c.review_count),
+                        )
+                        .returning(ProductModel.id)
+                    )
+                    fixed.extend(result.scalars())
+                await conn.commit()
+        finally:
+            # После ошибки транзакция прервана: откатываем её, чтобы снять блокировку
+            await conn.rollback()
+            await conn.execute(select(func.pg_advisory_unlock(RATING_RECONCILE_LOCK_ID)))
+            await conn.commit()
+
+    if fixed:
+        tags = [product_tag(product_id) for product_id in fixed]
+        await listing_cache.invalidate(*tags)
+        await product_cache.invalidate(*tags)
+    return len(fixed)
@@ -0,0 +1,53 @@
+from typing import Any
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+import orjson
+from pydantic import BaseModel, TypeAdapter
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    Класс ответа приложения по умолчанию: JSON через orjson вместо json.dumps.
+    Свой класс вместо fastapi.responses.ORJSONResponse, который в новых
+    версиях FastAPI помечен устаревшим.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def model_json_response(
+    model: BaseModel, *, status_code: int = 200, headers: dict[str, str] | None = None
+) -> Response:
+    """
+    Отдаёт уже собранную схему ответа: один проход сериализатора pydantic-core
+    без повторной валидации через response_model.
+    """
+    return Response(
+        content=model.model_dump_json(),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
+
+
+def rows_json_response(
+    adapter: TypeAdapter,
+    rows: Any,
+    *,
+    trusted: bool = False,
+    headers: dict[str, str] | None = None,
+) -> Response:
+    """
+    Отдаёт список строк: ORM-объекты проходят одну валидацию from_attributes,
+    а уже готовые экземпляры схем (trusted=True) сериализуются без проверки.
+    Сериализация pydantic-core сразу в байты вместо двойной проверки через response_model.
+    """
+    if not trusted:
+        rows = adapter.validate_python(rows)
+    return Response(
+        content=adapter.dump_json(rows),
+        headers=headers,
+        media_type="application/json",
+    )
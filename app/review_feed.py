@@ -0,0 +1,56 @@
+from datetime import datetime
+
+from fastapi import HTTPException, status
+from sqlalchemy import ColumnElement, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.reviews import ReviewModel
+from app.pagination import decode_cursor, encode_cursor
+from app.schemas import ReviewListSchema
+
+REVIEW_CURSOR_KIND = "reviews"
+
+
+def _after_cursor(cursor: str) -> ColumnElement:
+    """
+    Условие WHERE для отзывов строго после позиции курсора в порядке
+    (comment_date, id) по убыванию.
+    """
+    values = decode_cursor(cursor, REVIEW_CURSOR_KIND)
+    try:
+        position = tuple_(datetime.fromisoformat(values[0]), int(values[1]))
+    except (IndexError, TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return tuple_(ReviewModel.comment_date, ReviewModel.id) < position
+
+
+async def fetch_review_page(
+    db: AsyncSession, filters: list[ColumnElement], cursor: str | None, page_size: int
+) -> ReviewListSchema:
+    """
+    Страница активных отзывов, новые первыми. Keyset-пагинация по (comment_date, id)
+    идёт по индексам ix_reviews_active_feed / ix_reviews_active_product_feed,
+    поэтому стоимость страницы не зависит от её глубины.
+    """
+    stmt = select(ReviewModel).where(ReviewModel.is_active == True, *filters)
+    if cursor is not None:
+        stmt = stmt.where(_after_cursor(cursor))
+    reviews = (
+        await db.scalars(
+            stmt.order_by(ReviewModel.comment_date.desc(), ReviewModel.id.desc()).limit(
+                page_size + 1
+            )
+        )
+    ).all()
+
+    has_more = len(reviews) > page_size
+    reviews = reviews[:page_size]
+    next_cursor = None
+    if has_more:
+        last_review = reviews[-1]
+        next_cursor = encode_cursor(
+            REVIEW_CURSOR_KIND, [last_review.comment_date.isoformat(), last_review.id]
+        )
+    return ReviewListSchema(
+        items=reviews, page_size=page_size, has_more=has_more, next_cursor=next_cursor
+    )
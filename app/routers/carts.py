@@ -5,11 +5,11 @@ from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.auth import get_current_user
+from app.auth import Principal, get_current_user
 from app.db_depends import get_async_db
 from app.models.cart_items import CartItemModel
 from app.models.products import ProductModel
-from app.models.users import UserModel
+from app.responses import model_json_response
 from app.schemas import (
     CartItemCreateSchema,
     CartItemSchema,
@@ -51,7 +51,7 @@ async def _get_cart_item(db: AsyncSession, user_id: int, product_id: int) -> Car
 @router.get("/", response_model=CartSchema)
 async def get_cart(
     db: AsyncSession = Depends(get_async_db),
-    current_user: UserModel = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     result = await db.scalars(
         select(CartItemModel)
@@ -69,19 +69,21 @@ async def get_cart(
     )
     total_price_decimal = sum(price_items, Decimal("0"))
 
-    return CartSchema(
+    cart = CartSchema(
         user_id=current_user.id,
         items=list(items),  # type: ignore[arg-type] # Pydantic автоматически преобразует CartItemModel в CartItem через from_attributes=True
         total_quantity=total_quantity,
         total_price=total_price_decimal,
     )
+    # Схема уже проверена при создании, повторная валидация через response_model не нужна
+    return model_json_response(cart)
 
 
 @router.post("/items", response_model=CartItemSchema, status_code=status.HTTP_201_CREATED)
 async def add_item_to_cart(
     payload: CartItemCreateSchema,
     db: AsyncSession = Depends(get_async_db),
-    current_user: UserModel = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     product = await _ensure_product_available(db, payload.product_id)
 
@@ -115,7 +117,7 @@ async def update_cart_item(
     product_id: int,
     payload: CartItemUpdateSchema,
     db: AsyncSession = Depends(get_async_db),
-    current_user: UserModel = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     product = await _ensure_product_available(db, product_id)
 
@@ -140,7 +142,7 @@ async def update_cart_item(
 async def remove_item_from_cart(
     product_id: int,
     db: AsyncSession = Depends(get_async_db),
-    current_user: UserModel = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     cart_item = await _get_cart_item(db, current_user.id, product_id)
     if not cart_item:
@@ -154,7 +156,7 @@ async def remove_item_from_cart(
 @router.delete("/", status_code=status.HTTP_204_NO_CONTENT)
 async def clear_cart(
     db: AsyncSession = Depends(get_async_db),
-    current_user: UserModel = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     await db.execute(delete(CartItemModel).where(CartItemModel.user_id == current_user.id))
     await db.commit()
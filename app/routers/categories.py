@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from pydantic import TypeAdapter
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth import get_current_admin
+from app.cache import CATEGORY_TREE_TAG, category_tag, listing_cache, product_cache
+from app.category_registry import category_registry
+from app.category_tree import add_category_to_closure, is_in_subtree, move_category_subtree
 from app.db_depends import get_async_db
+from app.http_cache import cache_headers, is_not_modified, make_etag, not_modified_response
 from app.models.categories import CategoryModel
-from app.schemas import CategoryCreateSchema, CategorySchema
+from app.responses import rows_json_response
+from app.schemas import CategoryCreateSchema, CategorySchema, CategoryTreeSchema
 
 # Создаём маршрутизатор с префиксом и тегом
 router = APIRouter(
@@ -13,15 +19,33 @@ router = APIRouter(
     tags=["categories"],
 )
 
+# Реестр отдаёт готовые экземпляры схем, их достаточно сериализовать
+_category_list_adapter = TypeAdapter(list[CategorySchema])
+_category_tree_adapter = TypeAdapter(list[CategoryTreeSchema])
+
 
 @router.get("/", response_model=list[CategorySchema])
-async def get_all_categories(db: AsyncSession = Depends(get_async_db)):
+async def get_all_categories(request: Request, db: AsyncSession = Depends(get_async_db)):
     """
     Возвращает список всех активных категорий.
+    ETag строится по содержимому реестра, на совпадающий If-None-Match отвечаем 304.
+    """
+    categories = await category_registry.active_categories(db)
+    headers = cache_headers(make_etag("categories", category_registry.fingerprint))
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+    return rows_json_response(_category_list_adapter, categories, trusted=True, headers=headers)
+
+
+@router.get("/tree", response_model=list[CategoryTreeSchema])
+async def get_category_tree(db: AsyncSession = Depends(get_async_db)):
     """
-    result = await db.scalars(select(CategoryModel).where(CategoryModel.is_active == True))
-    categories = result.all()
-    return categories
+    Возвращает дерево активных категорий с количеством активных товаров в каждом узле.
+    Отдаётся из реестра категорий в памяти.
+    """
+    return rows_json_response(
+        _category_tree_adapter, await category_registry.tree(db), trusted=True
+    )
 
 
 @router.post(
@@ -47,7 +71,10 @@ async def create_category(category: CategoryCreateSchema, db: AsyncSession = Dep
     # Создание новой категории
     db_category = CategoryModel(**category.model_dump())
     db.add(db_category)
+    await db.flush()
+    await add_category_to_closure(db, db_category.id, db_category.parent_id)
     await db.commit()
+    await category_registry.load(db)
     return db_category
 
 
@@ -86,13 +113,25 @@ async def update_category(
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Category cannot be its own parent"
             )
+        if await is_in_subtree(db, category_id, parent.id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Category cannot be moved under its own subcategory",
+            )
 
     # Обновляем категорию
+    old_parent_id = db_category.parent_id
     update_data = category.model_dump(exclude_unset=True)
     await db.execute(
         update(CategoryModel).where(CategoryModel.id == category_id).values(**update_data)
     )
+    new_parent_id = update_data.get("parent_id", old_parent_id)
+    if new_parent_id != old_parent_id:
+        await move_category_subtree(db, category_id, new_parent_id)
     await db.commit()
+    await category_registry.load(db)
+    await listing_cache.invalidate(CATEGORY_TREE_TAG, category_tag(category_id))
+    await product_cache.invalidate(category_tag(category_id))
     return db_category
 
 
@@ -114,5 +153,10 @@ async def delete_category(category_id: int, db: AsyncSession = Depends(get_async
     await db.execute(
         update(CategoryModel).where(CategoryModel.id == category_id).values(is_active=False)
     )
+    # Структура дерева при мягком удалении не меняется, поэтому замыкание остаётся прежним:
+    # неактивные категории отсекаются при выборке поддерева
     await db.commit()
+    await category_registry.load(db)
+    await listing_cache.invalidate(CATEGORY_TREE_TAG, category_tag(category_id))
+    await product_cache.invalidate(category_tag(category_id))
     return db_category
@@ -0,0 +1,40 @@
+from pathlib import Path
+import re
+
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import FileResponse
+
+from app.config import settings
+from app.http_cache import is_not_modified, not_modified_response
+from app.image_variants import variant_renderer
+from app.media_storage import CONTENT_HASH_RE
+
+router = APIRouter(prefix="/images", tags=["images"])
+
+IMAGE_FILE_NAME_RE = re.compile(r"[\w-]+(\.\w+)?")
+
+
+@router.get(
+    "/products/{variant}/{file_name}",
+    response_class=FileResponse,
+    responses={200: {"content": {"image/webp": {}}}},
+)
+async def get_product_image_variant(request: Request, variant: str, file_name: str):
+    """
+    Отдаёт уменьшенную WebP-копию изображения товара (thumbnail, card, full).
+    Отсутствующая копия рендерится по запросу в пуле процессов и кэшируется на диске.
+    Имя файла оригинала — хэш содержимого, поэтому ответ неизменяем, а условный
+    запрос с тем же ETag получает 304 без обращения к диску.
+    """
+    if variant not in settings.IMAGE_VARIANT_SIZES or not IMAGE_FILE_NAME_RE.fullmatch(file_name):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+    headers = {"cache-control": f"public, max-age={settings.MEDIA_CACHE_MAX_AGE}, immutable"}
+    stem = Path(file_name).stem
+    if CONTENT_HASH_RE.fullmatch(stem):
+        headers["etag"] = f'"{stem}-{variant}"'
+        if is_not_modified(request, headers):
+            return not_modified_response(headers)
+    path = await variant_renderer.get(file_name, variant)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+    return FileResponse(path, media_type="image/webp", headers=headers)
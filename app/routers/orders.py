@@ -1,15 +1,17 @@
 from decimal import Decimal
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import delete, func, select
+from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.auth import get_current_user
+from app.auth import Principal, get_current_user
+from app.cache import STOCK_FILTER_TAG, listing_cache, product_cache, product_tag
 from app.db_depends import get_async_db
 from app.models.cart_items import CartItemModel
 from app.models.orders import OrderItemModel, OrderModel
-from app.models.users import UserModel
+from app.pagination import TotalMode, fetch_with_total
+from app.responses import model_json_response
 from app.schemas import OrderListSchema, OrderSchema
 
 router = APIRouter(
@@ -32,7 +34,7 @@ async def _load_order_with_items(db: AsyncSession, order_id: int) -> OrderModel
 @router.post("/checkout", response_model=OrderSchema, status_code=status.HTTP_201_CREATED)
 async def checkout_order(
     db: AsyncSession = Depends(get_async_db),
-    current_user: UserModel = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     """
     Создаёт заказ на основе текущей корзины пользователя.
@@ -89,6 +91,14 @@ async def checkout_order(
     await db.execute(delete(CartItemModel).where(CartItemModel.user_id == current_user.id))
     await db.commit()
 
+    # Остатки изменились: сбрасываем списки с этими товарами,
+    # а при обнулении остатка — и списки с фильтром in_stock
+    stale_tags = [product_tag(item.product_id) for item in cart_items]
+    if any(item.product.stock == 0 for item in cart_items):
+        stale_tags.append(STOCK_FILTER_TAG)
+    await listing_cache.invalidate(*stale_tags)
+    await product_cache.invalidate(*(product_tag(item.product_id) for item in cart_items))
+
     created_order = await _load_order_with_items(db, order.id)
     if not created_order:
         raise HTTPException(
@@ -102,33 +112,45 @@ async def checkout_order(
 async def list_orders(
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
+    total_mode: TotalMode = Query(
+        TotalMode.EXACT,
+        description="Подсчёт total: 'exact' — точный, 'estimated' — оценка планировщика, 'none' — без подсчёта",
+    ),
     db: AsyncSession = Depends(get_async_db),
-    current_user: UserModel = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     """
     Возвращает заказы текущего пользователя с простой пагинацией.
     """
-    total = await db.scalar(
-        select(func.count(OrderModel.id)).where(OrderModel.user_id == current_user.id)
-    )
-    result = await db.scalars(
+    filtered_stmt = select(OrderModel.id).where(OrderModel.user_id == current_user.id)
+    page_stmt = (
         select(OrderModel)
         .options(selectinload(OrderModel.items).selectinload(OrderItemModel.product))
         .where(OrderModel.user_id == current_user.id)
         .order_by(OrderModel.created_at.desc())
         .offset((page - 1) * page_size)
-        .limit(page_size)
+        .limit(page_size + 1)
     )
+    result, total = await fetch_with_total(db, filtered_stmt, total_mode, db.scalars(page_stmt))
     orders = result.all()
-
-    return OrderListSchema(items=orders, total=total or 0, page=page, page_size=page_size)
+    has_more = len(orders) > page_size
+
+    return model_json_response(
+        OrderListSchema(
+            items=orders[:page_size],
+            total=total,
+            page=page,
+            page_size=page_size,
+            has_more=has_more,
+        )
+    )
 
 
 @router.get("/{order_id}", response_model=OrderSchema)
 async def get_order(
     order_id: int,
     db: AsyncSession = Depends(get_async_db),
-    current_user: UserModel = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     """
     Возвращает детальную информацию по заказу, если он принадлежит пользователю.
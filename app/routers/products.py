@@ -1,88 +1,163 @@
-import uuid
-from enum import Enum
+from collections.abc import AsyncIterator
+import csv
+from datetime import datetime
+from enum import Enum, StrEnum
+from functools import partial
+import io
+import json
+import re
+from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File
-from sqlalchemy import Boolean, desc, func, select, update
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Body,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import (
+    Boolean,
+    ColumnElement,
+    Integer,
+    Numeric,
+    Select,
+    and_,
+    any_,
+    bindparam,
+    cast,
+    column,
+    desc,
+    func,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
-from pathlib import Path
-from app.auth import get_current_seller
+
+from app.auth import Principal, get_current_seller
+from app.cache import (
+    ALL_PRODUCTS_TAG,
+    CATEGORY_TREE_TAG,
+    STOCK_FILTER_TAG,
+    category_subtree_tag,
+    category_tag,
+    listing_cache,
+    make_cache_key,
+    product_cache,
+    product_tag,
+    suggest_cache,
+)
+from app.category_registry import category_registry
+from app.category_tree import get_ancestor_ids, subtree_category_ids
+from app.config import settings
+from app.database import async_session_maker
 from app.db_depends import get_async_db
+from app.http_cache import cache_headers, is_not_modified, make_etag, not_modified_response
+from app.image_variants import variant_renderer
+from app.media import claim_uploaded_image, save_product_image
+from app.media_gc import acquire_media, release_media
 from app.models.categories import CategoryModel
 from app.models.products import ProductModel
 from app.models.reviews import ReviewModel
-from app.models.users import UserModel
+from app.pagination import (
+    TotalMode,
+    cursor_kind,
+    decode_cursor,
+    encode_cursor,
+    fetch_with_total,
+)
+from app.product_import import ImportTooLargeError, import_products
+from app.ratings import GRADES
+from app.responses import model_json_response
+from app.review_feed import fetch_review_page
 from app.schemas import (
+    ProductBatchSchema,
+    ProductBulkUpdateItemSchema,
+    ProductBulkUpdateResultSchema,
     ProductCreateSchema,
+    ProductImportResultSchema,
     ProductListSchema,
     ProductSchema,
-    ReviewSchema,
+    ProductSuggestionSchema,
+    ReviewListSchema,
+    ReviewSummarySchema,
 )
 
-BASE_DIR = Path(__file__).resolve().parent.parent.parent
-MEDIA_ROOT = BASE_DIR / "media" / "products"
-MEDIA_ROOT.mkdir(parents=True, exist_ok=True)
-ALLOWED_IMAGE_TYPES = {"image/jpeg", "image/png", "image/webp"}
-MAX_IMAGE_SIZE = 2 * 1024 * 1024  # 2 097 152 байт
+PRODUCT_NOT_FOUND_BODY = json.dumps({"detail": "Product not found or inactive"}).encode()
 
-async def save_product_image(file: UploadFile) -> str:
+
+async def _store_product_image(
+    image: UploadFile | None, image_upload_id: str | None, seller_id: int
+) -> str | None:
     """
-    Сохраняет изображение товара и возвращает относительный URL.
+    Сохраняет изображение из формы или забирает завершённую возобновляемую загрузку.
     """
-    if file.content_type not in ALLOWED_IMAGE_TYPES:
-        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Only JPG, PNG or WebP images are allowed")
+    if image and image_upload_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Pass either image or image_upload_id, not both",
+        )
+    if image:
+        return await save_product_image(image)
+    if image_upload_id:
+        return await claim_uploaded_image(image_upload_id, seller_id)
+    return None
 
-    content = await file.read()
-    if len(content) > MAX_IMAGE_SIZE:
-        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Image is too large")
 
-    extension = Path(file.filename or "").suffix.lower() or ".jpg"
-    file_name = f"{uuid.uuid4()}{extension}"
-    file_path = MEDIA_ROOT / file_name
-    file_path.write_bytes(content)
+_product_list_adapter = TypeAdapter(list[ProductSchema])
+_suggestion_list_adapter = TypeAdapter(list[ProductSuggestionSchema])
+SUGGEST_TOKEN_RE = re.compile(r"\w+")
 
-    return f"/media/products/{file_name}"
+FACET_NAMES = ("category", "price", "stock")
+# Границы ценовых диапазонов гистограммы фасета price
+PRICE_FACET_BOUNDS = (0, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000)
 
-def remove_product_image(url: str | None) -> None:
-    """
-    Удаляет файл изображения, если он существует.
-    """
-    if not url:
-        return
-    relative_path = url.lstrip("/")
-    file_path = BASE_DIR / relative_path
-    if file_path.exists():
-        file_path.unlink()
 
 class SortOrder(str, Enum):
     ASC = "asc"
     DESC = "desc"
 
 
-# Создаём маршрутизатор для товаров
-router = APIRouter(
-    prefix="/products",
-    tags=["products"],
-)
+class FeedFormat(StrEnum):
+    NDJSON = "ndjson"
+    CSV = "csv"
 
 
-@router.get("/", response_model=ProductListSchema)
-async def get_all_products(
-    page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=100),
-    category_id: int | None = Query(None, description="ID категории для фильтрации"),
-    search: str | None = Query(None, min_length=1, description="Поиск по названию/описанию"),
-    min_price: float | None = Query(None, ge=0, description="Минимальная цена товара"),
-    max_price: float | None = Query(None, ge=0, description="Максимальная цена товара"),
-    in_stock: bool | None = Query(
-        None, description="true — только товары в наличии, false — только без остатка"
-    ),
-    seller_id: int | None = Query(None, description="ID продавца для фильтрации"),
-    sort_by_created: SortOrder | None = Query(
-        None,
-        description="Сортировка по дате создания: 'desc' (новые сначала) или 'asc' (старые сначала). Если не указано, сортировка по id",
-    ),
-    db: AsyncSession = Depends(get_async_db),
-):
+EXPORT_FIELDS = tuple(ProductSchema.model_fields)
+
+
+def _export_csv_row(item: ProductSchema) -> list[Any]:
+    """
+    Строка CSV по столбцам заголовка EXPORT_FIELDS: вычисляемые поля схемы
+    (image_variants) в выгрузку не попадают.
+    """
+    data = item.model_dump(mode="json", include=set(EXPORT_FIELDS))
+    return [data[field] for field in EXPORT_FIELDS]
+
+
+def _product_filters(
+    category_id: int | None,
+    include_descendants: bool,
+    min_price: float | None,
+    max_price: float | None,
+    in_stock: bool | None,
+    seller_id: int | None,
+) -> list[ColumnElement]:
+    """
+    Условия WHERE для фильтров каталога (общие для списка и выгрузки).
+    """
     if min_price is not None and max_price is not None and min_price > max_price:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -91,7 +166,9 @@ async def get_all_products(
 
     filters = [ProductModel.is_active == True]
 
-    if category_id is not None:
+    if category_id is not None and include_descendants:
+        filters.append(ProductModel.category_id.in_(subtree_category_ids(category_id)))
+    elif category_id is not None:
         filters.append(ProductModel.category_id == category_id)
     if min_price is not None:
         filters.append(ProductModel.price >= min_price)
@@ -101,77 +178,455 @@ async def get_all_products(
         filters.append(ProductModel.stock > 0 if in_stock else ProductModel.stock == 0)
     if seller_id is not None:
         filters.append(ProductModel.seller_id == seller_id)
+    return filters
+
+
+def _cursor_values(sort_key: str, product: ProductModel, rank: float | None) -> list:
+    """
+    Возвращает значения ключа сортировки последнего товара страницы для курсора.
+    """
+    if sort_key in ("rank", "fuzzy"):
+        return [rank, product.id]
+    if sort_key in ("created_asc", "created_desc"):
+        return [product.created_at.isoformat(), product.id]
+    return [product.id]
+
+
+def _keyset_condition(sort_key: str, values: list, rank_expr: ColumnElement | None):
+    """
+    Строит условие WHERE, отбирающее строки строго после позиции курсора
+    в порядке сортировки sort_key.
+    """
+    try:
+        last_id = int(values[-1])
+        if sort_key in ("rank", "fuzzy") and rank_expr is not None:
+            last_rank = float(values[0])
+            # rank убывает, id возрастает — сравнение кортежей здесь не подходит
+            return or_(
+                rank_expr < last_rank, and_(rank_expr == last_rank, ProductModel.id > last_id)
+            )
+        if sort_key in ("created_asc", "created_desc"):
+            key = tuple_(ProductModel.created_at, ProductModel.id)
+            position = tuple_(datetime.fromisoformat(values[0]), last_id)
+            return key > position if sort_key == "created_asc" else key < position
+        return ProductModel.id > last_id
+    except (IndexError, TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def _parse_facets(facets: str | None) -> list[str]:
+    """
+    Разбирает параметр facets вида "category,price,stock" в список имён фасетов.
+    """
+    if not facets:
+        return []
+    requested = sorted({name.strip() for name in facets.split(",") if name.strip()})
+    unknown = [name for name in requested if name not in FACET_NAMES]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown facets: {', '.join(unknown)}. Allowed: {', '.join(FACET_NAMES)}",
+        )
+    return requested
 
-    # Базовый запрос total
-    total_stmt = select(func.count()).select_from(ProductModel).where(*filters)
 
-    rank_col = None
-    if search:
-        search_value = search.strip()
-        if search_value:
-            ts_query = func.websearch_to_tsquery("english", search_value)
-            filters.append(ProductModel.tsv.op("@@", return_type=Boolean())(ts_query))
-            rank_col = func.ts_rank_cd(ProductModel.tsv, ts_query).label("rank")
-            total_stmt = select(func.count()).select_from(ProductModel).where(*filters)
+def _parse_ids(ids: str) -> list[int]:
+    """
+    Разбирает параметр ids вида "3,1,2" в список ID без повторов с сохранением порядка.
+    """
+    try:
+        parsed = [int(value) for value in ids.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ids")
+    unique_ids = list(dict.fromkeys(parsed))
+    if not unique_ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid ids")
+    if len(unique_ids) > settings.BATCH_LOOKUP_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BATCH_LOOKUP_MAX_IDS} ids per request",
+        )
+    return unique_ids
 
-    total = await db.scalar(total_stmt) or 0
+
+async def _load_facets(
+    db: AsyncSession, filters: list[ColumnElement], requested: list[str]
+) -> dict:
+    """
+    Считает все запрошенные фасеты одним агрегирующим запросом через GROUPING SETS.
+    """
+    bounds = ",".join(str(bound) for bound in PRICE_FACET_BOUNDS)
+    columns = {
+        "category": ProductModel.category_id,
+        "price": func.width_bucket(
+            ProductModel.price, literal_column(f"ARRAY[{bounds}]::numeric[]")
+        ),
+        "stock": ProductModel.stock > literal_column("0"),
+    }
+    grouped = [columns[name] for name in requested]
+    stmt = (
+        select(*grouped, *(func.grouping(column) for column in grouped), func.count())
+        .where(*filters)
+        .group_by(func.grouping_sets(*grouped))
+    )
+    rows = (await db.execute(stmt)).all()
+
+    facets: dict = {}
+    if "category" in requested:
+        facets["categories"] = []
+    if "price" in requested:
+        facets["price"] = []
+    if "stock" in requested:
+        facets["stock"] = {"in_stock": 0, "out_of_stock": 0}
+
+    count_index = 2 * len(grouped)
+    for row in rows:
+        count = row[count_index]
+        # GROUPING() = 0 у того выражения, по которому сгруппирована строка
+        name, value = next(
+            (requested[i], row[i]) for i in range(len(grouped)) if row[len(grouped) + i] == 0
+        )
+        if name == "category":
+            facets["categories"].append({"category_id": value, "count": count})
+        elif name == "price":
+            upper = value if value < len(PRICE_FACET_BOUNDS) else None
+            facets["price"].append(
+                {
+                    "min_price": PRICE_FACET_BOUNDS[value - 1],
+                    "max_price": PRICE_FACET_BOUNDS[upper] if upper is not None else None,
+                    "count": count,
+                }
+            )
+        else:
+            facets["stock"]["in_stock" if value else "out_of_stock"] = count
+
+    if "categories" in facets:
+        facets["categories"].sort(key=lambda item: (-item["count"], item["category_id"]))
+    if "price" in facets:
+        facets["price"].sort(key=lambda item: item["min_price"])
+    return facets
+
+
+async def _fetch_product_page(
+    db: AsyncSession,
+    filters: list[ColumnElement],
+    search_value: str,
+    sort_by_created: SortOrder | None,
+    cursor: str | None,
+    page: int,
+    page_size: int,
+    total_mode: TotalMode,
+    search_mode: str | None,
+) -> tuple[list, int | None, str | None, list[ColumnElement]]:
+    """
+    Загружает страницу товаров и total для заданного режима поиска:
+    None — без поиска, "rank" — полнотекстовый, "fuzzy" — триграммный по названию.
+    Возвращает строки (товар, ранг), total, курсор следующей страницы и фильтры
+    с условием поиска, но без условия курсора (для total и фасетов).
+    """
+    filters = list(filters)
+    rank_expr = None
+    if search_mode == "rank":
+        ts_query = func.websearch_to_tsquery("english", search_value)
+        filters.append(ProductModel.tsv.op("@@", return_type=Boolean())(ts_query))
+        rank_expr = func.ts_rank_cd(ProductModel.tsv, ts_query)
+    elif search_mode == "fuzzy":
+        # % использует триграммный индекс, similarity() поднимает порог сходства
+        rank_expr = func.similarity(ProductModel.name, search_value)
+        candidates = (
+            select(ProductModel.id)
+            .where(
+                *filters,
+                ProductModel.name.op("%", return_type=Boolean())(search_value),
+                rank_expr >= settings.SEARCH_FUZZY_THRESHOLD,
+            )
+            .order_by(desc(rank_expr), ProductModel.id)
+            .limit(settings.SEARCH_FUZZY_MAX_CANDIDATES)
+        )
+        filters.append(ProductModel.id.in_(candidates))
+
+    # Запрос для подсчёта total: те же фильтры, но без условия курсора
+    search_filters = list(filters)
+    filtered_stmt = select(ProductModel.id).where(*search_filters)
 
     # Определяем сортировку
-    if rank_col is not None:
+    if search_mode is not None and rank_expr is not None:
+        # Ранжированная выдача: ключ курсора — режим поиска ("rank" или "fuzzy")
+        sort_key: str = search_mode
+        rank_col = rank_expr.label("rank")
         order_by = [desc(rank_col), ProductModel.id]
         base_stmt = select(ProductModel, rank_col)
     elif sort_by_created == SortOrder.ASC:
+        sort_key = "created_asc"
         order_by = [ProductModel.created_at.asc(), ProductModel.id.asc()]
         base_stmt = select(ProductModel)
     elif sort_by_created == SortOrder.DESC:
+        sort_key = "created_desc"
         order_by = [ProductModel.created_at.desc(), ProductModel.id.desc()]
         base_stmt = select(ProductModel)
     else:
+        sort_key = "id"
         order_by = [ProductModel.id]
         base_stmt = select(ProductModel)
 
-    products_stmt = (
-        base_stmt.where(*filters)
-        .order_by(*order_by)
-        .offset((page - 1) * page_size)
-        .limit(page_size)
+    # Берём на одну строку больше, чтобы узнать, есть ли следующая страница
+    if cursor is not None:
+        filters.append(_keyset_condition(sort_key, decode_cursor(cursor, sort_key), rank_expr))
+        products_stmt = base_stmt.where(*filters).order_by(*order_by).limit(page_size + 1)
+    else:
+        products_stmt = (
+            base_stmt.where(*filters)
+            .order_by(*order_by)
+            .offset((page - 1) * page_size)
+            .limit(page_size + 1)
+        )
+
+    result, total = await fetch_with_total(db, filtered_stmt, total_mode, db.execute(products_stmt))
+    rows = [(row[0], row[1] if rank_expr is not None else None) for row in result.all()]
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last_product, last_rank = rows[-1]
+        next_cursor = encode_cursor(sort_key, _cursor_values(sort_key, last_product, last_rank))
+    return rows, total, next_cursor, search_filters
+
+
+def _suggest_stmt(tokens: list[str], prefix: str, limit: int) -> Select:
+    """
+    Подсказки по префиксам слов. Сортируются не все совпадения, а не больше
+    limit * SUGGEST_CANDIDATE_FACTOR кандидатов из индекса: для короткого
+    префикса совпадений может быть большая часть таблицы.
+    """
+    # Выражение должно совпадать с выражением индекса, поэтому конфигурация — литерал
+    name_tsv = func.to_tsvector(literal_column("'simple'"), ProductModel.name)
+    ts_query = func.to_tsquery(
+        literal_column("'simple'"), " & ".join(f"{token}:*" for token in tokens)
+    )
+    candidates = (
+        select(ProductModel.id, ProductModel.name, ProductModel.rating)
+        .where(
+            ProductModel.is_active == True,
+            name_tsv.op("@@", return_type=Boolean())(ts_query),
+        )
+        .limit(limit * settings.SUGGEST_CANDIDATE_FACTOR)
+        .subquery()
+    )
+    return (
+        select(candidates.c.id, candidates.c.name)
+        .order_by(
+            # Сначала названия, которые начинаются с введённой строки целиком
+            desc(func.lower(candidates.c.name).startswith(prefix, autoescape=True)),
+            desc(candidates.c.rating),
+            candidates.c.id,
+        )
+        .limit(limit)
     )
 
-    if rank_col is not None:
-        result = await db.execute(products_stmt)
-        items = [row[0] for row in result.all()]
-    else:
-        items = (await db.scalars(products_stmt)).all()
 
-    return {
-        "items": items,
-        "total": total,
-        "page": page,
-        "page_size": page_size,
-    }
+async def _category_listing_tags(db: AsyncSession, *category_ids: int) -> list[str]:
+    """
+    Теги кэшированных списков, которые меняются при записи товара в категориях:
+    список самой категории и списки поддеревьев всех её предков.
+    """
+    tags = []
+    for category_id in set(category_ids):
+        tags.append(category_tag(category_id))
+        tags.extend(
+            category_subtree_tag(ancestor_id)
+            for ancestor_id in await get_ancestor_ids(db, category_id)
+        )
+    return tags
+
+
+async def _stream_export(stmt: Select, export_format: FeedFormat) -> AsyncIterator[bytes]:
+    """
+    Читает товары серверным курсором и отдаёт их по одной пачке за раз.
+    Сессия открывается внутри генератора: зависимость get_async_db
+    не обязана жить до конца отправки потокового ответа.
+    """
+    async with async_session_maker() as session:
+        result = await session.stream(stmt)
+        if export_format == FeedFormat.CSV:
+            header = io.StringIO()
+            csv.writer(header).writerow(EXPORT_FIELDS)
+            yield header.getvalue().encode()
+
+        async for rows in result.partitions():
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                item = ProductSchema.model_validate(dict(row._mapping))
+                if export_format == FeedFormat.CSV:
+                    writer.writerow(_export_csv_row(item))
+                else:
+                    buffer.write(item.model_dump_json())
+                    buffer.write("\n")
+            yield buffer.getvalue().encode()
+
+
+# Создаём маршрутизатор для товаров
+router = APIRouter(
+    prefix="/products",
+    tags=["products"],
+)
+
+
+@router.get("/", response_model=ProductListSchema)
+async def get_all_products(
+    request: Request,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    category_id: int | None = Query(None, description="ID категории для фильтрации"),
+    include_descendants: bool = Query(
+        False, description="Включать товары всех подкатегорий category_id"
+    ),
+    search: str | None = Query(None, min_length=1, description="Поиск по названию/описанию"),
+    min_price: float | None = Query(None, ge=0, description="Минимальная цена товара"),
+    max_price: float | None = Query(None, ge=0, description="Максимальная цена товара"),
+    in_stock: bool | None = Query(
+        None, description="true — только товары в наличии, false — только без остатка"
+    ),
+    seller_id: int | None = Query(None, description="ID продавца для фильтрации"),
+    sort_by_created: SortOrder | None = Query(
+        None,
+        description="Сортировка по дате создания: 'desc' (новые сначала) или 'asc' (старые сначала). Если не указано, сортировка по id",
+    ),
+    cursor: str | None = Query(
+        None,
+        description="Курсор следующей страницы из next_cursor. Если указан, page игнорируется",
+    ),
+    total_mode: TotalMode = Query(
+        TotalMode.EXACT,
+        description="Подсчёт total: 'exact' — точный, 'estimated' — оценка планировщика, 'none' — без подсчёта",
+    ),
+    facets: str | None = Query(None, description="Фасеты через запятую: category, price, stock"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    filters = _product_filters(
+        category_id, include_descendants, min_price, max_price, in_stock, seller_id
+    )
+    requested_facets = _parse_facets(facets)
+
+    cache_key = make_cache_key(
+        "products:list",
+        page=page,
+        page_size=page_size,
+        category_id=category_id,
+        include_descendants=include_descendants,
+        search=search,
+        min_price=min_price,
+        max_price=max_price,
+        in_stock=in_stock,
+        seller_id=seller_id,
+        sort_by_created=sort_by_created,
+        cursor=cursor,
+        total_mode=total_mode,
+        facets=",".join(requested_facets) or None,
+    )
+    # Закэшированный ответ хранит свои валидаторы: 304 и попадание обходятся без базы
+    cached = await listing_cache.get(cache_key)
+    if cached is not None:
+        if is_not_modified(request, cached.headers):
+            return not_modified_response(cached.headers)
+        return cached
+    generation = listing_cache.generation
+
+    search_value = search.strip() if search else ""
+    search_mode = None
+    if search_value:
+        # Курсор нечёткой выдачи сразу продолжает её, не повторяя полнотекстовый поиск
+        search_mode = "fuzzy" if cursor is not None and cursor_kind(cursor) == "fuzzy" else "rank"
+
+    fetch_page = partial(
+        _fetch_product_page,
+        db,
+        filters,
+        search_value,
+        sort_by_created,
+        cursor,
+        page,
+        page_size,
+        total_mode,
+    )
+    rows, total, next_cursor, search_filters = await fetch_page(search_mode)
+
+    # Полнотекстовый поиск ничего не нашёл (опечатка, слово не из английского словаря) —
+    # повторяем по триграммному сходству названия
+    if search_mode == "rank" and not rows and cursor is None and (page == 1 or total == 0):
+        search_mode = "fuzzy"
+        rows, total, next_cursor, search_filters = await fetch_page(search_mode)
+
+    facet_counts = None
+    if requested_facets:
+        facet_counts = await _load_facets(db, search_filters, requested_facets)
+
+    items = [product for product, _ in rows]
+    # Валидатор — набор фильтров и updated_at строк самой страницы вместе с total
+    # и фасетами. Last-Modified не отправляем: max(updated_at) страницы уменьшается,
+    # когда товар уходит из выдачи, и If-Modified-Since ответил бы 304 по ошибке
+    headers = cache_headers(
+        make_etag(
+            cache_key,
+            category_registry.fingerprint,
+            [(product.id, product.updated_at) for product in items],
+            total,
+            next_cursor,
+            facet_counts,
+        )
+    )
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+
+    response = ProductListSchema.model_validate(
+        {
+            "items": items,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "has_more": next_cursor is not None,
+            "next_cursor": next_cursor,
+            "facets": facet_counts,
+            "fuzzy": search_mode == "fuzzy",
+        }
+    )
+
+    # Список без фильтра по категории меняется при записи любого товара
+    if category_id is None:
+        tags = [ALL_PRODUCTS_TAG]
+    elif include_descendants:
+        tags = [category_subtree_tag(category_id), CATEGORY_TREE_TAG]
+    else:
+        tags = [category_tag(category_id)]
+    if in_stock is not None or "stock" in requested_facets:
+        tags.append(STOCK_FILTER_TAG)
+    tags.extend(product_tag(product.id) for product in items)
+    return await listing_cache.store(
+        cache_key, response.model_dump_json().encode(), tags, generation, headers=headers
+    )
 
 
 @router.post("/", response_model=ProductSchema, status_code=status.HTTP_201_CREATED)
 async def create_product(
+        background_tasks: BackgroundTasks,
         product: ProductCreateSchema = Depends(ProductCreateSchema.as_form),
         image: UploadFile | None = File(None),
+        image_upload_id: str | None = Form(
+            None, description="ID завершённой загрузки из /uploads/images вместо файла image"
+        ),
         db: AsyncSession = Depends(get_async_db),
-        current_user: UserModel = Depends(get_current_seller)
+        current_user: Principal = Depends(get_current_seller)
 ):
     """
     Создаёт новый товар, привязанный к текущему продавцу (только для 'seller').
     """
 
-    category_result = await db.scalars(
-        select(CategoryModel).where(CategoryModel.id == product.category_id,
-                                    CategoryModel.is_active == True)
-    )
-    if not category_result.first():
+    if not await category_registry.is_active(db, product.category_id):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail="Category not found or inactive")
 
     # Сохранение изображения (если есть)
-    image_url = await save_product_image(image) if image else None
+    image_url = await _store_product_image(image, image_upload_id, current_user.id)
 
     # Создание товара
     db_product = ProductModel(
@@ -180,75 +635,338 @@ async def create_product(
         image_url=image_url,
     )
 
+    stale_tags = await _category_listing_tags(db, product.category_id)
     db.add(db_product)
+    if image_url:
+        await acquire_media(db, image_url)
     await db.commit()
+    await listing_cache.invalidate(ALL_PRODUCTS_TAG, *stale_tags)
+    await suggest_cache.invalidate(ALL_PRODUCTS_TAG)
+    # ID нового товара мог попасть в кэш как отсутствующий
+    await product_cache.invalidate(product_tag(db_product.id))
+    category_registry.invalidate_counts()
+    if image_url:
+        # Копии для списков и карточек рендерятся после отправки ответа
+        background_tasks.add_task(variant_renderer.pregenerate, image_url)
     await db.refresh(db_product)
     return db_product
 
 
+@router.get("/suggest", response_model=list[ProductSuggestionSchema])
+async def suggest_products(
+    q: str = Query(..., min_length=1, max_length=100, description="Начало названия товара"),
+    limit: int = Query(10, ge=1, le=20, description="Максимальное количество подсказок"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Автодополнение по названию товара: каждое слово запроса ищется как префикс
+    по индексу ix_products_name_prefix_gin. Горячие префиксы отдаются из кэша.
+    Запрос короче SUGGEST_MIN_PREFIX_LENGTH символов до базы не доходит.
+    """
+    tokens = SUGGEST_TOKEN_RE.findall(q.casefold())
+    prefix = " ".join(tokens)
+    if len(prefix) < settings.SUGGEST_MIN_PREFIX_LENGTH:
+        return []
+
+    cache_key = make_cache_key("products:suggest", q=prefix, limit=limit)
+    cached = await suggest_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    generation = suggest_cache.generation
+
+    rows = (await db.execute(_suggest_stmt(tokens, prefix, limit))).all()
+    body = _suggestion_list_adapter.dump_json(_suggestion_list_adapter.validate_python(rows))
+    return await suggest_cache.store(cache_key, body, [ALL_PRODUCTS_TAG], generation)
+
+
+@router.get("/batch", response_model=ProductBatchSchema)
+async def get_products_batch(
+    ids: str = Query(..., description="ID товаров через запятую"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Возвращает активные товары активных категорий по списку ID одним запросом
+    (WHERE id = ANY(:ids)) в порядке, в котором ID переданы.
+    Не найденные и неактивные товары перечисляются в missing_ids.
+    """
+    product_ids = _parse_ids(ids)
+    stmt = (
+        select(ProductModel)
+        .join(
+            CategoryModel,
+            and_(CategoryModel.id == ProductModel.category_id, CategoryModel.is_active == True),
+        )
+        .where(
+            ProductModel.id == any_(bindparam("ids", product_ids, type_=ARRAY(Integer))),
+            ProductModel.is_active == True,
+        )
+    )
+    products = {product.id: product for product in (await db.scalars(stmt)).all()}
+    return ProductBatchSchema(
+        items=[
+            ProductSchema.model_validate(products[product_id])
+            for product_id in product_ids
+            if product_id in products
+        ],
+        missing_ids=[product_id for product_id in product_ids if product_id not in products],
+    )
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}, "text/csv": {}}}},
+)
+async def export_products(
+    format: FeedFormat = Query(
+        FeedFormat.NDJSON, description="Формат выгрузки: ndjson или csv"
+    ),
+    category_id: int | None = Query(None, description="ID категории для фильтрации"),
+    include_descendants: bool = Query(
+        False, description="Включать товары всех подкатегорий category_id"
+    ),
+    search: str | None = Query(None, min_length=1, description="Поиск по названию/описанию"),
+    min_price: float | None = Query(None, ge=0, description="Минимальная цена товара"),
+    max_price: float | None = Query(None, ge=0, description="Максимальная цена товара"),
+    in_stock: bool | None = Query(
+        None, description="true — только товары в наличии, false — только без остатка"
+    ),
+    seller_id: int | None = Query(None, description="ID продавца для фильтрации"),
+):
+    """
+    Потоковая выгрузка активных товаров (фид для партнёров) с теми же фильтрами,
+    что и GET /products. Строки читаются серверным курсором пачками по
+    EXPORT_BATCH_SIZE, поэтому память не зависит от размера выгрузки.
+    """
+    filters = _product_filters(
+        category_id, include_descendants, min_price, max_price, in_stock, seller_id
+    )
+    search_value = search.strip() if search else ""
+    if search_value:
+        ts_query = func.websearch_to_tsquery("english", search_value)
+        filters.append(ProductModel.tsv.op("@@", return_type=Boolean())(ts_query))
+
+    stmt = (
+        select(*(getattr(ProductModel, field) for field in EXPORT_FIELDS))
+        .where(*filters)
+        .order_by(ProductModel.id)
+        .execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+    )
+    media_type = "text/csv" if format == FeedFormat.CSV else "application/x-ndjson"
+    return StreamingResponse(
+        _stream_export(stmt, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="products.{format.value}"'},
+    )
+
+
+@router.post(
+    "/import",
+    response_model=ProductImportResultSchema,
+    openapi_extra={
+        "requestBody": {"content": {"application/x-ndjson": {}, "text/csv": {}}, "required": True}
+    },
+)
+async def import_products_feed(
+    request: Request,
+    format: FeedFormat = Query(FeedFormat.NDJSON, description="Формат файла: ndjson или csv"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_seller),
+):
+    """
+    Массовый импорт товаров текущего продавца (только для 'seller').
+    Тело запроса — NDJSON или CSV с заголовком; поля те же, что в ProductCreateSchema.
+    Файл читается потоком и загружается через COPY во временную таблицу,
+    строки с ошибками пропускаются и перечисляются в ответе.
+    """
+    try:
+        result = await import_products(db, request.stream(), format, current_user.id)
+    except ImportTooLargeError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Import is limited to {settings.IMPORT_MAX_ROWS} rows",
+        )
+
+    if result["imported"]:
+        stale_tags = await _category_listing_tags(db, *result["category_ids"])
+        await db.commit()
+        await listing_cache.invalidate(ALL_PRODUCTS_TAG, *stale_tags)
+        await suggest_cache.invalidate(ALL_PRODUCTS_TAG)
+        await product_cache.invalidate(
+            *(product_tag(product_id) for product_id in result["product_ids"])
+        )
+        category_registry.invalidate_counts()
+    else:
+        await db.rollback()
+    return ProductImportResultSchema.model_validate(result)
+
+
+@router.patch("/bulk", response_model=ProductBulkUpdateResultSchema)
+async def bulk_update_products(
+    items: list[ProductBulkUpdateItemSchema] = Body(
+        ..., min_length=1, max_length=settings.BULK_UPDATE_MAX_ITEMS
+    ),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_seller),
+):
+    """
+    Пакетно меняет цены и остатки товаров текущего продавца (только для 'seller').
+    Все позиции применяются одним UPDATE ... FROM (VALUES ...); товары, которые не
+    найдены, неактивны или принадлежат другому продавцу, возвращаются в rejected_ids.
+    """
+    # При повторе ID действует последняя позиция
+    changes_by_id = {item.id: item for item in items}
+    changes = values(
+        column("id", Integer),
+        column("price", Numeric(10, 2)),
+        column("stock", Integer),
+        name="changes",
+    ).data([(item.id, item.price, item.stock) for item in changes_by_id.values()])
+
+    # CAST нужен, когда весь столбец VALUES состоит из NULL и PostgreSQL выводит тип text
+    stmt = (
+        update(ProductModel)
+        .where(
+            ProductModel.id == changes.c.id,
+            ProductModel.seller_id == current_user.id,
+            ProductModel.is_active == True,
+        )
+        .values(
+            price=func.coalesce(cast(changes.c.price, Numeric(10, 2)), ProductModel.price),
+            stock=func.coalesce(cast(changes.c.stock, Integer), ProductModel.stock),
+        )
+        .returning(ProductModel)
+    )
+    result = await db.scalars(stmt, execution_options={"synchronize_session": False})
+    updated = sorted(result.all(), key=lambda product: product.id)
+    updated_ids = {product.id for product in updated}
+    rejected_ids = sorted(changes_by_id.keys() - updated_ids)
+
+    if not updated:
+        await db.rollback()
+        return ProductBulkUpdateResultSchema(rejected_ids=rejected_ids)
+
+    stale_tags = await _category_listing_tags(db, *{product.category_id for product in updated})
+    response = ProductBulkUpdateResultSchema(
+        updated=[ProductSchema.model_validate(product) for product in updated],
+        rejected_ids=rejected_ids,
+    )
+    await db.commit()
+    product_tags = [product_tag(product_id) for product_id in updated_ids]
+    await listing_cache.invalidate(ALL_PRODUCTS_TAG, *product_tags, *stale_tags)
+    await product_cache.invalidate(*product_tags)
+    return response
+
+
 @router.get("/category/{category_id}", response_model=list[ProductSchema])
-async def get_products_by_category(category_id: int, db: AsyncSession = Depends(get_async_db)):
+async def get_products_by_category(
+    category_id: int,
+    include_descendants: bool = Query(False, description="Включать товары всех подкатегорий"),
+    db: AsyncSession = Depends(get_async_db),
+):
     """
     Возвращает список активных товаров в указанной категории по её ID.
     """
-    # Проверяем, существует ли активная категория
-    result = await db.scalars(
-        select(CategoryModel).where(
-            CategoryModel.id == category_id, CategoryModel.is_active == True
-        )
+    cache_key = make_cache_key(
+        "products:category", category_id=category_id, include_descendants=include_descendants
     )
-    category = result.first()
-    if not category:
+    cached = await listing_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    generation = listing_cache.generation
+
+    # Проверяем, существует ли активная категория
+    if not await category_registry.is_active(db, category_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Category not found or inactive"
         )
 
     # Получаем активные товары в категории
+    if include_descendants:
+        category_filter = ProductModel.category_id.in_(subtree_category_ids(category_id))
+        tags = [category_subtree_tag(category_id), CATEGORY_TREE_TAG]
+    else:
+        category_filter = ProductModel.category_id == category_id
+        tags = [category_tag(category_id)]
     product_result = await db.scalars(
-        select(ProductModel).where(
-            ProductModel.category_id == category_id, ProductModel.is_active == True
-        )
+        select(ProductModel).where(category_filter, ProductModel.is_active == True)
     )
-    return product_result.all()
+    products = product_result.all()
+    body = _product_list_adapter.dump_json(_product_list_adapter.validate_python(products))
+    tags.extend(product_tag(product.id) for product in products)
+    return await listing_cache.store(cache_key, body, tags, generation)
 
 
-@router.get("/{product_id}", response_model=ProductSchema)
-async def get_product(product_id: int, db: AsyncSession = Depends(get_async_db)):
+@router.get(
+    "/{product_id}",
+    response_model=ProductSchema,
+    responses={404: {"description": "Product not found or inactive"}},
+)
+async def get_product(
+    product_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+):
     """
     Возвращает детальную информацию о товаре по его ID.
+    Карточка отдаётся из product_cache; отсутствующие и неактивные ID тоже
+    кэшируются (404) на PRODUCT_CACHE_NEGATIVE_TTL, чтобы перебор ID не доходил до базы.
+    Промахи хранятся в отдельном небольшом LRU и не вытесняют настоящие карточки.
+    Валидаторы ответа — updated_at товара; при совпадении отвечаем 304 без тела.
     """
+    cache_key = make_cache_key("products:detail", product_id=product_id)
+    cached = await product_cache.get(cache_key)
+    if cached is not None:
+        if cached.status_code == status.HTTP_200_OK and is_not_modified(request, cached.headers):
+            return not_modified_response(cached.headers)
+        return cached
+    generation = product_cache.generation
+
     # Проверяем, существует ли активный товар
     product_result = await db.scalars(
         select(ProductModel).where(ProductModel.id == product_id, ProductModel.is_active == True)
     )
     product = product_result.first()
     if not product:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Product not found or inactive"
+        return await product_cache.store(
+            cache_key,
+            PRODUCT_NOT_FOUND_BODY,
+            [product_tag(product_id)],
+            generation,
+            status_code=status.HTTP_404_NOT_FOUND,
+            ttl=settings.PRODUCT_CACHE_NEGATIVE_TTL,
         )
 
     # Проверяем, существует ли активная категория
-    category_result = await db.scalars(
-        select(CategoryModel).where(
-            CategoryModel.id == product.category_id, CategoryModel.is_active == True
-        )
-    )
-    category = category_result.first()
-    if not category:
+    if not await category_registry.is_active(db, product.category_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Category not found or inactive"
         )
 
-    return product
+    headers = cache_headers(make_etag("product", product.id, product.updated_at), product.updated_at)
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+    return await product_cache.store(
+        cache_key,
+        ProductSchema.model_validate(product).model_dump_json().encode(),
+        [product_tag(product_id), category_tag(product.category_id)],
+        generation,
+        headers=headers,
+    )
 
 
 @router.put("/{product_id}", response_model=ProductSchema)
 async def update_product(
         product_id: int,
+        background_tasks: BackgroundTasks,
         product: ProductCreateSchema = Depends(ProductCreateSchema.as_form),
         image: UploadFile | None = File(None),
+        image_upload_id: str | None = Form(
+            None, description="ID завершённой загрузки из /uploads/images вместо файла image"
+        ),
         db: AsyncSession = Depends(get_async_db),
-        current_user: UserModel = Depends(get_current_seller)
+        current_user: Principal = Depends(get_current_seller)
 ):
     """
     Обновляет товар, если он принадлежит текущему продавцу (только для 'seller').
@@ -260,23 +978,28 @@ async def update_product(
     if db_product.seller_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                             detail="You can only update your own products")
-    category_result = await db.scalars(
-        select(CategoryModel).where(CategoryModel.id == product.category_id,
-                                    CategoryModel.is_active == True)
-    )
-    if not category_result.first():
+    if not await category_registry.is_active(db, product.category_id):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail="Category not found or inactive")
 
+    stale_tags = await _category_listing_tags(db, db_product.category_id, product.category_id)
     await db.execute(
         update(ProductModel).where(ProductModel.id == product_id).values(**product.model_dump())
     )
 
-    if image:
-        remove_product_image(db_product.image_url)
-        db_product.image_url = await save_product_image(image)
+    image_url = await _store_product_image(image, image_upload_id, current_user.id)
+    if image_url and image_url != db_product.image_url:
+        await release_media(db, db_product.image_url)
+        await acquire_media(db, image_url)
+        db_product.image_url = image_url
 
     await db.commit()
+    await listing_cache.invalidate(ALL_PRODUCTS_TAG, product_tag(product_id), *stale_tags)
+    await product_cache.invalidate(product_tag(product_id))
+    await suggest_cache.invalidate(ALL_PRODUCTS_TAG)
+    category_registry.invalidate_counts()
+    if image_url:
+        background_tasks.add_task(variant_renderer.pregenerate, image_url)
     await db.refresh(db_product)
     return db_product
 
@@ -284,7 +1007,7 @@ async def update_product(
 async def delete_product(
     product_id: int,
     db: AsyncSession = Depends(get_async_db),
-    current_user: UserModel = Depends(get_current_seller)
+    current_user: Principal = Depends(get_current_seller)
 ):
     """
     Выполняет мягкое удаление товара, если он принадлежит текущему продавцу (только для 'seller').
@@ -297,34 +1020,90 @@ async def delete_product(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found or inactive")
     if product.seller_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You can only delete your own products")
+    stale_tags = await _category_listing_tags(db, product.category_id)
     await db.execute(
         update(ProductModel).where(ProductModel.id == product_id).values(is_active=False)
     )
-    remove_product_image(product.image_url)
+    await release_media(db, product.image_url)
 
     await db.commit()
+    await listing_cache.invalidate(ALL_PRODUCTS_TAG, product_tag(product_id), *stale_tags)
+    await product_cache.invalidate(product_tag(product_id))
+    await suggest_cache.invalidate(ALL_PRODUCTS_TAG)
+    category_registry.invalidate_counts()
     await db.refresh(product)
     return product
 
-@router.get("/{product_id}/reviews/", response_model=list[ReviewSchema])
-async def get_reviews_by_product(product_id: int, db: AsyncSession = Depends(get_async_db)):
+@router.get("/{product_id}/reviews/", response_model=ReviewListSchema)
+async def get_reviews_by_product(
+    product_id: int,
+    request: Request,
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="Курсор следующей страницы из next_cursor"),
+    db: AsyncSession = Depends(get_async_db),
+):
     """
     Получение отзывов о конкретном товаре.
     Доступ: Разрешён всем.
-    Возвращает список активных отзывов для указанного товара.
+    Возвращает активные отзывы товара постранично, новые первыми.
+    ETag строится по updated_at товара: добавление и удаление отзыва меняют
+    агрегаты оценок в строке товара тем же запросом, что и сам отзыв.
     """
-    product_result = await db.scalars(
-        select(ProductModel).where(ProductModel.id == product_id, ProductModel.is_active == True)
+    updated_at = await db.scalar(
+        select(ProductModel.updated_at).where(
+            ProductModel.id == product_id, ProductModel.is_active == True
+        )
     )
-    product = product_result.first()
-    if not product:
+    if updated_at is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Product not found or inactive"
         )
 
-    reviews_result = await db.scalars(
-        select(ReviewModel).where(
-            ReviewModel.product_id == product_id, ReviewModel.is_active == True
+    headers = cache_headers(
+        make_etag("reviews", product_id, updated_at, cursor, page_size), updated_at
+    )
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+
+    page = await fetch_review_page(db, [ReviewModel.product_id == product_id], cursor, page_size)
+    return model_json_response(page, headers=headers)
+
+
+@router.get("/{product_id}/reviews/summary", response_model=ReviewSummarySchema)
+async def get_review_summary(
+    product_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Сводка отзывов товара: число отзывов, средняя оценка и распределение по оценкам.
+    Читается из агрегатов в строке товара (grade_counts поддерживается приращениями),
+    отзывы не сканируются.
+    """
+    result = await db.execute(
+        select(
+            ProductModel.review_count,
+            ProductModel.rating,
+            ProductModel.grade_counts,
+            ProductModel.updated_at,
+        ).where(ProductModel.id == product_id, ProductModel.is_active == True)
+    )
+    row = result.first()
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Product not found or inactive"
         )
+
+    headers = cache_headers(make_etag("review-summary", product_id, row.updated_at), row.updated_at)
+    if is_not_modified(request, headers):
+        return not_modified_response(headers)
+
+    summary = ReviewSummarySchema(
+        product_id=product_id,
+        review_count=row.review_count,
+        rating=row.rating,
+        grades=[
+            {"grade": grade, "count": row.grade_counts[grade - 1]} for grade in reversed(GRADES)
+        ],
     )
-    return reviews_result.all()
+    return model_json_response(summary, headers=headers)
@@ -1,50 +1,40 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func, select
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
-from app.auth import get_current_buyer, get_current_user
+from app.auth import Principal, get_current_buyer, get_current_user
+from app.cache import listing_cache, product_cache, product_tag
 from app.db_depends import get_async_db
-from app.models import ProductModel, UserModel
 from app.models.reviews import ReviewModel
-from app.schemas import ReviewCreateSchema, ReviewSchema
+from app.ratings import add_review, deactivate_review
+from app.responses import model_json_response
+from app.review_feed import fetch_review_page
+from app.schemas import ReviewCreateSchema, ReviewListSchema, ReviewSchema
 
 router = APIRouter(prefix="/reviews", tags=["Reviews"])
 
 
-async def update_product_rating(db: AsyncSession, product_id: int):
-    """
-    Пересчитывает средний рейтинг товара на основе всех активных отзывов.
-    Обновляет поле rating в модели Product без commit.
-    """
-    result = await db.execute(
-        select(func.avg(ReviewModel.grade)).where(
-            ReviewModel.product_id == product_id, ReviewModel.is_active == True
-        )
-    )
-    avg_rating = result.scalar() or 0.0
-
-    product = await db.get(ProductModel, product_id)
-    if product:
-        product.rating = float(avg_rating)
-
-
-@router.get("/", response_model=list[ReviewSchema])
-async def get_reviews(db: Annotated[AsyncSession, Depends(get_async_db)]):
+@router.get("/", response_model=ReviewListSchema)
+async def get_reviews(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    page_size: Annotated[int, Query(ge=1, le=100)] = 20,
+    cursor: Annotated[
+        str | None, Query(description="Курсор следующей страницы из next_cursor")
+    ] = None,
+):
     """
-    Возвращает список всех активных отзывов
+    Возвращает ленту активных отзывов постранично, новые первыми.
     """
-    reviews_stmt = select(ReviewModel).where(ReviewModel.is_active.is_(True))
-    return (await db.scalars(reviews_stmt)).all()
+    return model_json_response(await fetch_review_page(db, [], cursor, page_size))
 
 
 @router.post("/", response_model=ReviewSchema)
 async def create_review(
     review_payload: ReviewCreateSchema,
     db: Annotated[AsyncSession, Depends(get_async_db)],
-    buyer: Annotated[UserModel, Depends(get_current_buyer)],
+    buyer: Annotated[Principal, Depends(get_current_buyer)],
 ):
     """
     Создает отзыв
@@ -53,35 +43,32 @@ async def create_review(
     :param buyer:
     :return:
     """
-    product = await db.get(ProductModel, review_payload.product_id)
+    # Отзыв и приращение агрегатов оценок товара — один запрос
+    review = await add_review(db, buyer.id, **review_payload.model_dump())
 
-    if not product or not product.is_active:
+    if review is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Product with id {review_payload.product_id} is not found",
         )
-    db_review = ReviewModel(**review_payload.model_dump(), user_id=buyer.id)
-    db.add(db_review)
-    await db.flush()
-
-    await update_product_rating(db, review_payload.product_id)
 
     await db.commit()
-    await db.refresh(db_review)
+    await listing_cache.invalidate(product_tag(review_payload.product_id))
+    await product_cache.invalidate(product_tag(review_payload.product_id))
 
-    return db_review
+    return review
 
 
 @router.delete("/{review_id}")
 async def delete_review(
     review_id: int,
     db: Annotated[AsyncSession, Depends(get_async_db)],
-    current_user: Annotated[UserModel, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
 ):
     """
     Мягкое удаление отзыва по review_id.
     Доступ: Автор отзыва или пользователи с ролью "admin".
-    После удаления пересчитывает рейтинг товара.
+    Оценка вычитается из агрегатов рейтинга товара тем же запросом.
     """
     review: ReviewModel | None = await db.get(ReviewModel, review_id)
 
@@ -102,14 +89,15 @@ async def delete_review(
             detail="You don't have permission to delete this review",
         )
 
-    product_id: int = int(review.product_id)
-
-    review.is_active = False
-
-    await db.flush()
-
-    await update_product_rating(db, product_id)
+    product_id = await deactivate_review(db, review_id)
+    if product_id is None:
+        # Отзыв успели удалить параллельным запросом
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Review is already inactive"
+        )
 
     await db.commit()
+    await listing_cache.invalidate(product_tag(product_id))
+    await product_cache.invalidate(product_tag(product_id))
 
     return {"message": "Review deleted"}
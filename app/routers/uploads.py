@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, Header, Request, status
+
+from app.auth import Principal, get_current_seller
+from app.media import append_upload_chunk, create_upload_session, get_upload_session
+from app.schemas import UploadCreateSchema, UploadSessionSchema
+
+# Возобновляемая загрузка изображений товаров кусками. Клиент открывает загрузку,
+# отправляет куски PUT-запросами с Upload-Offset и после обрыва продолжает
+# с offset из GET. Завершённую загрузку передают в форму товара как image_upload_id.
+router = APIRouter(prefix="/uploads", tags=["uploads"])
+
+
+@router.post("/images", response_model=UploadSessionSchema, status_code=status.HTTP_201_CREATED)
+async def create_image_upload(
+    upload: UploadCreateSchema, current_user: Principal = Depends(get_current_seller)
+):
+    """
+    Открывает возобновляемую загрузку изображения (только для 'seller').
+    """
+    return await create_upload_session(current_user.id, upload.size)
+
+
+@router.get("/images/{upload_id}", response_model=UploadSessionSchema)
+async def get_image_upload(upload_id: str, current_user: Principal = Depends(get_current_seller)):
+    """
+    Возвращает, сколько байт загрузки уже принято.
+    """
+    return await get_upload_session(upload_id, current_user.id)
+
+
+@router.put(
+    "/images/{upload_id}",
+    response_model=UploadSessionSchema,
+    openapi_extra={"requestBody": {"content": {"application/octet-stream": {}}, "required": True}},
+)
+async def upload_image_chunk(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., ge=0, description="Смещение куска в файле"),
+    current_user: Principal = Depends(get_current_seller),
+):
+    """
+    Принимает очередной кусок загрузки. Тело читается потоком и дописывается
+    в файл в пуле потоков, не занимая цикл событий.
+    """
+    return await append_upload_chunk(upload_id, current_user.id, upload_offset, request.stream())
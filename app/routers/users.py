@@ -4,11 +4,26 @@ import jwt
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.auth import create_access_token, create_refresh_token, hash_password, verify_password
+from app.auth import (
+    create_access_token,
+    create_refresh_token,
+    get_current_admin,
+    hash_password,
+    notify_user_changed,
+    principal_cache,
+    verify_password,
+)
 from app.config import ALGORITHM, SECRET_KEY
 from app.db_depends import get_async_db
 from app.models.users import UserModel
-from app.schemas import RefreshTokenRequestSchema, UserCreateSchema, UserSchema
+from app.password_hasher import password_hasher
+from app.schemas import (
+    PasswordHashingStatsSchema,
+    RefreshTokenRequestSchema,
+    UserAdminUpdateSchema,
+    UserCreateSchema,
+    UserSchema,
+)
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -27,7 +42,7 @@ async def create_user(user: UserCreateSchema, db: AsyncSession = Depends(get_asy
 
     # Создание объекта пользователя с хешированным паролем
     db_user = UserModel(
-        email=user.email, hashed_password=hash_password(user.password), role=user.role
+        email=user.email, hashed_password=await hash_password(user.password), role=user.role
     )
 
     # Добавление в сессию и сохранение в базе
@@ -36,6 +51,49 @@ async def create_user(user: UserCreateSchema, db: AsyncSession = Depends(get_asy
     return db_user
 
 
+@router.get(
+    "/password-hashing/stats",
+    response_model=PasswordHashingStatsSchema,
+    dependencies=[Depends(get_current_admin)],
+)
+async def get_password_hashing_stats():
+    """
+    Метрики пула хеширования паролей текущего воркера (только для 'admin').
+    """
+    stats = password_hasher.stats
+    completed = stats.completed or 1
+    return PasswordHashingStatsSchema(
+        workers=password_hasher.workers,
+        in_flight=password_hasher.in_flight,
+        queued=password_hasher.queued,
+        completed=stats.completed,
+        rejected=stats.rejected,
+        avg_wait_ms=stats.wait_seconds / completed * 1000,
+        avg_hash_ms=stats.hash_seconds / completed * 1000,
+        max_hash_ms=stats.max_hash_seconds * 1000,
+    )
+
+
+@router.patch("/{user_id}", response_model=UserSchema, dependencies=[Depends(get_current_admin)])
+async def update_user(
+    user_id: int, changes: UserAdminUpdateSchema, db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Меняет роль пользователя или блокирует его (только для 'admin').
+    Кэш авторизации пользователя сбрасывается сразу после commit
+    во всех воркерах (NOTIFY в той же транзакции).
+    """
+    user = await db.get(UserModel, user_id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    for field, value in changes.model_dump(exclude_none=True).items():
+        setattr(user, field, value)
+    await notify_user_changed(db, user_id)
+    await db.commit()
+    await principal_cache.invalidate(user_id)
+    return user
+
+
 @router.post("/token")
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)
@@ -47,7 +105,9 @@ async def login(
         select(UserModel).where(UserModel.email == form_data.username, UserModel.is_active == True)
     )
     user = result.first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    hashed_password = user.hashed_password if user is not None else None
+    # Для несуществующего email verify_password проверяет фиктивный хеш и вернёт False
+    if not await verify_password(form_data.password, hashed_password) or user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
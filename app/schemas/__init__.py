@@ -5,23 +5,66 @@ from app.schemas.cart_items import (
     CartItemUpdateSchema,
     CartSchema,
 )
-from app.schemas.categories import CategoryCreateSchema, CategorySchema
+from app.schemas.categories import CategoryCreateSchema, CategorySchema, CategoryTreeSchema
 from app.schemas.orders import OrderItemSchema, OrderListSchema, OrderSchema
-from app.schemas.products import ProductCreateSchema, ProductListSchema, ProductSchema
-from app.schemas.reviews import ReviewCreateSchema, ReviewSchema
-from app.schemas.users import RefreshTokenRequestSchema, UserCreateSchema, UserSchema
+from app.schemas.products import (
+    CategoryFacetSchema,
+    PriceBucketSchema,
+    ProductBatchSchema,
+    ProductBulkUpdateItemSchema,
+    ProductBulkUpdateResultSchema,
+    ProductCreateSchema,
+    ProductFacetsSchema,
+    ProductImportErrorSchema,
+    ProductImportResultSchema,
+    ProductListSchema,
+    ProductSchema,
+    ProductSuggestionSchema,
+    StockFacetSchema,
+)
+from app.schemas.reviews import (
+    ReviewCreateSchema,
+    ReviewGradeCountSchema,
+    ReviewListSchema,
+    ReviewSchema,
+    ReviewSummarySchema,
+)
+from app.schemas.uploads import UploadCreateSchema, UploadSessionSchema
+from app.schemas.users import (
+    PasswordHashingStatsSchema,
+    RefreshTokenRequestSchema,
+    UserAdminUpdateSchema,
+    UserCreateSchema,
+    UserSchema,
+)
 
 __all__ = [
     "CategorySchema",
     "CategoryCreateSchema",
+    "CategoryTreeSchema",
     "ProductSchema",
     "ProductCreateSchema",
     "UserSchema",
     "UserCreateSchema",
+    "UserAdminUpdateSchema",
+    "PasswordHashingStatsSchema",
     "RefreshTokenRequestSchema",
     "ReviewSchema",
     "ReviewCreateSchema",
+    "ReviewListSchema",
+    "ReviewGradeCountSchema",
+    "ReviewSummarySchema",
     "ProductListSchema",
+    "ProductFacetsSchema",
+    "CategoryFacetSchema",
+    "PriceBucketSchema",
+    "StockFacetSchema",
+    "ProductSuggestionSchema",
+    "ProductImportResultSchema",
+    "ProductImportErrorSchema",
+    "ProductBatchSchema",
+    "ProductBulkUpdateItemSchema",
+    "ProductBulkUpdateResultSchema",
     "CartItemSchema",
     "CartItemCreateSchema",
     "CartSchema",
@@ -30,4 +73,6 @@ __all__ = [
     "OrderListSchema",
     "OrderItemSchema",
     "CartItemBaseSchema",
+    "UploadCreateSchema",
+    "UploadSessionSchema",
 ]
@@ -25,3 +25,20 @@ class CategorySchema(BaseModel):
     is_active: bool = Field(..., description="Активность категории")
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class CategoryTreeSchema(BaseModel):
+    """
+    Узел дерева активных категорий с количеством активных товаров.
+    """
+
+    id: int = Field(..., description="Уникальный идентификатор категории")
+    name: str = Field(..., description="Название категории")
+    parent_id: int | None = Field(None, description="ID родительской категории, если есть")
+    product_count: int = Field(..., ge=0, description="Активные товары непосредственно в категории")
+    total_product_count: int = Field(
+        ..., ge=0, description="Активные товары в категории и всех подкатегориях"
+    )
+    children: list["CategoryTreeSchema"] = Field(
+        default_factory=list, description="Дочерние категории"
+    )
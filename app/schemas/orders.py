@@ -31,8 +31,11 @@ class OrderSchema(BaseModel):
 
 class OrderListSchema(BaseModel):
     items: list[OrderSchema] = Field(..., description="Заказы на текущей странице")
-    total: int = Field(ge=0, description="Общее количество заказов")
+    total: int | None = Field(
+        None, ge=0, description="Общее количество заказов (None при total_mode=none)"
+    )
     page: int = Field(ge=1, description="Текущая страница")
     page_size: int = Field(ge=1, description="Размер страницы")
+    has_more: bool = Field(False, description="Есть ли следующая страница")
 
     model_config = ConfigDict(from_attributes=True)
@@ -3,7 +3,16 @@ from decimal import Decimal
 from typing import Annotated
 
 from fastapi import Form
-from pydantic import BaseModel, ConfigDict, Field, field_serializer
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    computed_field,
+    field_serializer,
+    model_validator,
+)
+
+from app.media import image_variant_urls
 
 
 class ProductCreateSchema(BaseModel):
@@ -64,17 +73,147 @@ class ProductSchema(BaseModel):
         """Преобразует Decimal в float для корректной сериализации в JSON."""
         return float(value)
 
+    @computed_field(description="URL уменьшенных WebP-копий изображения: thumbnail, card, full")
+    @property
+    def image_variants(self) -> dict[str, str] | None:
+        return image_variant_urls(self.image_url)
+
     model_config = ConfigDict(from_attributes=True)
 
 
+class ProductSuggestionSchema(BaseModel):
+    """
+    Подсказка автодополнения по названию товара.
+    """
+
+    id: int = Field(..., description="ID товара")
+    name: str = Field(..., description="Название товара")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CategoryFacetSchema(BaseModel):
+    """
+    Количество товаров в категории для текущих фильтров.
+    """
+
+    category_id: int = Field(..., description="ID категории")
+    count: int = Field(..., ge=0, description="Количество товаров")
+
+
+class PriceBucketSchema(BaseModel):
+    """
+    Ценовой диапазон гистограммы: min_price <= price < max_price.
+    """
+
+    min_price: float = Field(..., ge=0, description="Нижняя граница диапазона (включительно)")
+    max_price: float | None = Field(
+        None, description="Верхняя граница диапазона (не включительно), None — без ограничения"
+    )
+    count: int = Field(..., ge=0, description="Количество товаров")
+
+
+class StockFacetSchema(BaseModel):
+    """
+    Количество товаров в наличии и без остатка.
+    """
+
+    in_stock: int = Field(0, ge=0, description="Товары с остатком больше 0")
+    out_of_stock: int = Field(0, ge=0, description="Товары без остатка")
+
+
+class ProductFacetsSchema(BaseModel):
+    """
+    Фасеты каталога для текущих фильтров и поискового запроса.
+    Заполняются только запрошенные в параметре facets.
+    """
+
+    categories: list[CategoryFacetSchema] | None = Field(None, description="Счётчики по категориям")
+    price: list[PriceBucketSchema] | None = Field(None, description="Гистограмма цен")
+    stock: StockFacetSchema | None = Field(None, description="Счётчики наличия")
+
+
 class ProductListSchema(BaseModel):
     """
     Список пагинации для товаров.
     """
 
     items: list[ProductSchema] = Field(description="Товары для текущей страницы")
-    total: int = Field(ge=0, description="Общее количество товаров")
+    total: int | None = Field(
+        None, ge=0, description="Общее количество товаров (None при total_mode=none)"
+    )
     page: int = Field(ge=1, description="Номер текущей страницы")
     page_size: int = Field(ge=1, description="Количество элементов на странице")
+    has_more: bool = Field(False, description="Есть ли следующая страница")
+    next_cursor: str | None = Field(
+        None, description="Курсор следующей страницы (None, если страница последняя)"
+    )
+    facets: ProductFacetsSchema | None = Field(None, description="Фасеты, если запрошены")
+    fuzzy: bool = Field(
+        False, description="Полнотекстовый поиск ничего не нашёл, выдача по сходству названия"
+    )
 
     model_config = ConfigDict(from_attributes=True)  # Для чтения из ORM-объектов
+
+
+class ProductBatchSchema(BaseModel):
+    """
+    Ответ пакетного получения товаров по списку ID.
+    """
+
+    items: list[ProductSchema] = Field(
+        default_factory=list, description="Найденные товары в порядке запрошенных ID"
+    )
+    missing_ids: list[int] = Field(
+        default_factory=list, description="ID, для которых нет активного товара"
+    )
+
+
+class ProductBulkUpdateItemSchema(BaseModel):
+    """
+    Изменение цены и/или остатка одного товара в PATCH /products/bulk.
+    Не переданные поля остаются без изменений.
+    """
+
+    id: int = Field(..., description="ID товара")
+    price: Decimal | None = Field(None, gt=0, decimal_places=2, description="Новая цена товара")
+    stock: int | None = Field(None, ge=0, description="Новый остаток на складе")
+
+    @model_validator(mode="after")
+    def check_has_changes(self) -> "ProductBulkUpdateItemSchema":
+        if self.price is None and self.stock is None:
+            raise ValueError("Either price or stock must be provided")
+        return self
+
+
+class ProductBulkUpdateResultSchema(BaseModel):
+    """
+    Итог пакетного обновления цен и остатков.
+    """
+
+    updated: list[ProductSchema] = Field(default_factory=list, description="Изменённые товары")
+    rejected_ids: list[int] = Field(
+        default_factory=list,
+        description="ID товаров, которые не найдены, неактивны или принадлежат другому продавцу",
+    )
+
+
+class ProductImportErrorSchema(BaseModel):
+    """
+    Ошибка в отдельной строке файла импорта.
+    """
+
+    row: int = Field(..., ge=1, description="Номер строки данных (без заголовка CSV)")
+    message: str = Field(..., description="Причина, по которой строка не загружена")
+
+
+class ProductImportResultSchema(BaseModel):
+    """
+    Итог массового импорта товаров.
+    """
+
+    imported: int = Field(..., ge=0, description="Количество созданных товаров")
+    failed: int = Field(..., ge=0, description="Количество отклонённых строк")
+    errors: list[ProductImportErrorSchema] = Field(
+        default_factory=list, description="Ошибки по строкам"
+    )
@@ -31,3 +31,40 @@ class ReviewSchema(BaseModel):
     is_active: bool = Field(..., description="Активность отзыва")
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ReviewListSchema(BaseModel):
+    """
+    Страница ленты отзывов (keyset-пагинация, новые первыми).
+    """
+
+    items: list[ReviewSchema] = Field(description="Отзывы текущей страницы")
+    page_size: int = Field(ge=1, description="Размер страницы")
+    has_more: bool = Field(False, description="Есть ли следующая страница")
+    next_cursor: str | None = Field(
+        None, description="Курсор следующей страницы (None, если страница последняя)"
+    )
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ReviewGradeCountSchema(BaseModel):
+    """
+    Число активных отзывов с одной оценкой.
+    """
+
+    grade: int = Field(..., ge=1, le=5, description="Оценка")
+    count: int = Field(..., ge=0, description="Количество отзывов с этой оценкой")
+
+
+class ReviewSummarySchema(BaseModel):
+    """
+    Сводка отзывов товара: средняя оценка и распределение по оценкам.
+    """
+
+    product_id: int = Field(..., description="ID товара")
+    review_count: int = Field(..., ge=0, description="Количество активных отзывов")
+    rating: float = Field(..., ge=0.0, le=5.0, description="Средний рейтинг товара (0.0-5.0)")
+    grades: list[ReviewGradeCountSchema] = Field(
+        ..., description="Распределение по оценкам от 5 до 1"
+    )
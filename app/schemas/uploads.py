@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+
+
+class UploadCreateSchema(BaseModel):
+    """
+    Модель для открытия возобновляемой загрузки изображения.
+    """
+
+    size: int = Field(..., gt=0, description="Полный размер файла в байтах")
+
+
+class UploadSessionSchema(BaseModel):
+    """
+    Состояние возобновляемой загрузки.
+    """
+
+    upload_id: str = Field(..., description="ID загрузки")
+    size: int = Field(..., description="Заявленный размер файла в байтах")
+    offset: int = Field(..., ge=0, description="Сколько байт уже принято")
+    complete: bool = Field(..., description="Файл загружен полностью")
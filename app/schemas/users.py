@@ -11,6 +11,15 @@ class UserCreateSchema(BaseModel):
     )
 
 
+class UserAdminUpdateSchema(BaseModel):
+    role: str | None = Field(
+        default=None,
+        pattern="^(buyer|seller|admin)$",
+        description="Новая роль: 'buyer', 'seller' или 'admin'",
+    )
+    is_active: bool | None = Field(default=None, description="false — заблокировать пользователя")
+
+
 class UserSchema(BaseModel):
     id: int
     email: EmailStr
@@ -21,3 +30,14 @@ class UserSchema(BaseModel):
 
 class RefreshTokenRequestSchema(BaseModel):
     refresh_token: str
+
+
+class PasswordHashingStatsSchema(BaseModel):
+    workers: int = Field(description="Потоков в пуле bcrypt")
+    in_flight: int = Field(description="Хешей считается сейчас")
+    queued: int = Field(description="Запросов ждут свободный поток")
+    completed: int = Field(description="Выполнено операций с запуска воркера")
+    rejected: int = Field(description="Отклонено с 503 из-за перегрузки")
+    avg_wait_ms: float = Field(description="Среднее ожидание в очереди, мс")
+    avg_hash_ms: float = Field(description="Среднее время хеширования или проверки, мс")
+    max_hash_ms: float = Field(description="Максимальное время хеширования или проверки, мс")
@@ -0,0 +1,136 @@
+"""
+Сравнение сериализации списка товаров: response_model + json.dumps (как было),
+response_model + orjson и готовые байты pydantic-core (rows_json_response).
+
+Запуск из корня репозитория, база данных не нужна:
+
+    python scripts/bench_serialization.py --items 100 --rounds 25
+
+Для каждого варианта печатается минимальное процессорное время на запрос
+по чередующимся раундам, чтобы фоновые колебания нагрузки не искажали сравнение.
+"""
+
+import argparse
+import asyncio
+from datetime import UTC, datetime
+from decimal import Decimal
+from pathlib import Path
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.responses import ORJSONResponse, rows_json_response
+from app.schemas import ProductSchema
+
+
+def make_rows(count: int) -> list[SimpleNamespace]:
+    """Строки, похожие на ORM-объекты ProductModel (читаются через from_attributes)."""
+    now = datetime.now(UTC)
+    return [
+        SimpleNamespace(
+            id=index,
+            name=f"Товар {index}",
+            description="Описание товара " * 8,
+            price=Decimal("1999.90"),
+            image_url=f"/media/products/{index:032x}.jpg",
+            stock=index % 50,
+            category_id=index % 10 + 1,
+            seller_id=1,
+            rating=4.5,
+            is_active=True,
+            created_at=now,
+            updated_at=now,
+        )
+        for index in range(1, count + 1)
+    ]
+
+
+def build_app(rows: list[SimpleNamespace]) -> FastAPI:
+    app = FastAPI()
+    adapter = TypeAdapter(list[ProductSchema])
+
+    @app.get("/json", response_model=list[ProductSchema], response_class=JSONResponse)
+    async def with_json():
+        return rows
+
+    @app.get("/orjson", response_model=list[ProductSchema], response_class=ORJSONResponse)
+    async def with_orjson():
+        return rows
+
+    @app.get("/bytes")
+    async def with_bytes():
+        return rows_json_response(adapter, rows)
+
+    return app
+
+
+async def request(app: FastAPI, path: str) -> bytes:
+    """Один GET через ASGI в том же процессе, без сети и HTTP-клиента."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "server": ("bench", 80),
+        "client": ("bench", 1),
+    }
+    body = bytearray()
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return bytes(body)
+
+
+async def run(items: int, rounds: int, requests_per_round: int) -> None:
+    app = build_app(make_rows(items))
+    variants = {
+        "response_model + json.dumps": "/json",
+        "response_model + orjson": "/orjson",
+        "pydantic-core bytes": "/bytes",
+    }
+    for path in variants.values():
+        await request(app, path)
+
+    best = dict.fromkeys(variants, float("inf"))
+    for _ in range(rounds):
+        for name, path in variants.items():
+            started = time.process_time()
+            for _ in range(requests_per_round):
+                await request(app, path)
+            per_request = (time.process_time() - started) / requests_per_round
+            best[name] = min(best[name], per_request)
+
+    print(f"{items} товаров в ответе, минимум по {rounds} раундам:")
+    for name, seconds in best.items():
+        print(f"  {name:<30} {seconds * 1_000_000:8.0f} us/req")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=25)
+    parser.add_argument("--requests", type=int, default=20, help="Запросов в одном раунде")
+    args = parser.parse_args()
+    asyncio.run(run(args.items, args.rounds, args.requests))
+
+
+if __name__ == "__main__":
+    main()
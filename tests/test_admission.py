@@ -0,0 +1,62 @@
+import asyncio
+
+from app.admission import AdaptiveLimiter, AdmissionControlMiddleware, RouteClass
+
+
+def make_limiter() -> AdaptiveLimiter:
+    return AdaptiveLimiter(
+        max_limit=64, min_limit=2, latency_target=0.25, max_queue=10, queue_timeout=1.0
+    )
+
+
+async def call(middleware: AdmissionControlMiddleware, path: str) -> list[dict]:
+    scope = {"type": "http", "method": "GET", "path": path, "headers": []}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, receive, send)
+    return messages
+
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def test_saturated_pool_rejects_even_with_free_slots():
+    limiter = make_limiter()
+    saturated = True
+    middleware = AdmissionControlMiddleware(
+        ok_app,
+        limiters=dict.fromkeys(RouteClass, limiter),
+        pool_saturated=lambda: saturated,
+    )
+
+    async def scenario():
+        nonlocal saturated
+        start = (await call(middleware, "/products/"))[0]
+        assert start["status"] == 503
+        assert (b"retry-after", b"1") in start["headers"]
+        assert limiter.in_flight == 0
+
+        saturated = False
+        start = (await call(middleware, "/products/"))[0]
+        assert start["status"] == 200
+        assert limiter.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_unclassified_requests_ignore_saturation():
+    middleware = AdmissionControlMiddleware(
+        ok_app,
+        limiters={route_class: make_limiter() for route_class in RouteClass},
+        pool_saturated=lambda: True,
+    )
+    start = asyncio.run(call(middleware, "/products/export"))[0]
+    assert start["status"] == 200
@@ -0,0 +1,58 @@
+"""
+Кэш пользователей сбрасывается во всех воркерах через LISTEN/NOTIFY.
+Тест подписки нужен PostgreSQL: адрес в TEST_DATABASE_URL (postgresql+asyncpg://...).
+"""
+
+import asyncio
+import os
+
+import asyncpg
+import pytest
+
+from app.auth import USER_CHANGES_CHANNEL, Principal, _listen_user_changes_once, principal_cache
+
+DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+
+def test_principal_cache_is_bypassed_without_subscription():
+    async def scenario():
+        principal_cache.subscribed = False
+        await principal_cache.store(Principal(id=1, email="a@example.com", role="buyer"), 0)
+        assert await principal_cache.get(1) is None
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+def test_notification_invalidates_principal():
+    dsn = DATABASE_URL.replace("+asyncpg", "")
+    principal = Principal(id=42, email="seller@example.com", role="seller")
+
+    async def scenario():
+        listener = asyncio.create_task(_listen_user_changes_once(dsn))
+        try:
+            async with asyncio.timeout(5):
+                while not principal_cache.subscribed:
+                    await asyncio.sleep(0.01)
+            await principal_cache.store(principal, principal_cache.generation)
+            assert await principal_cache.get(principal.id) == principal
+
+            # Изменение из «другого воркера»: своё соединение, NOTIFY при commit
+            connection = await asyncpg.connect(dsn)
+            try:
+                await connection.execute(
+                    "SELECT pg_notify($1, $2)", USER_CHANGES_CHANNEL, str(principal.id)
+                )
+            finally:
+                await connection.close()
+
+            async with asyncio.timeout(5):
+                while await principal_cache.get(principal.id) is not None:
+                    await asyncio.sleep(0.01)
+        finally:
+            listener.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await listener
+        assert not principal_cache.subscribed
+
+    asyncio.run(scenario())
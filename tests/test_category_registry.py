@@ -0,0 +1,66 @@
+import asyncio
+
+from app.category_registry import CategoryRegistry
+
+
+class FakeResult:
+    def all(self):
+        return []
+
+    def tuples(self):
+        return self
+
+
+class FakeSession:
+    """Считает запросы; каждый «выполняется» с паузой, как поход в базу."""
+
+    def __init__(self):
+        self.queries = 0
+
+    async def scalars(self, stmt):
+        self.queries += 1
+        await asyncio.sleep(0.01)
+        return FakeResult()
+
+    async def execute(self, stmt):
+        return await self.scalars(stmt)
+
+
+def test_concurrent_reload_runs_once():
+    async def scenario():
+        registry = CategoryRegistry()
+        db = FakeSession()
+        await asyncio.gather(*(registry.ensure_loaded(db) for _ in range(20)))
+        assert db.queries == 1
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_count_refresh_after_invalidation_runs_once():
+    async def scenario():
+        registry = CategoryRegistry()
+        db = FakeSession()
+        await registry.tree(db)
+        registry.invalidate_counts()
+        db.queries = 0
+        await asyncio.gather(*(registry.tree(db) for _ in range(20)))
+        assert db.queries == 1
+
+    asyncio.run(scenario())
+
+
+def test_invalidation_during_count_refresh_keeps_counts_stale():
+    async def scenario():
+        registry = CategoryRegistry()
+        db = FakeSession()
+        await registry.ensure_loaded(db)
+        refresh = asyncio.create_task(registry.tree(db))
+        await asyncio.sleep(0)
+        # Товар записан, пока GROUP BY ещё выполняется
+        registry.invalidate_counts()
+        await refresh
+        db.queries = 0
+        await registry.tree(db)
+        assert db.queries == 1
+
+    asyncio.run(scenario())
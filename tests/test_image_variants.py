@@ -0,0 +1,58 @@
+import asyncio
+import os
+from pathlib import Path
+
+from PIL import Image
+import pytest
+
+from app import image_variants
+from app.image_variants import VariantDiskCache, VariantRenderer
+
+
+def _crash_render(*args):
+    # Имитирует процесс рендера, убитый OOM-killer
+    os._exit(1)
+
+
+@pytest.fixture
+def source_image(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    source = tmp_path / "source.png"
+    Image.new("RGB", (200, 100), "red").save(source)
+    monkeypatch.setattr(image_variants.media_storage, "local_path", lambda file_name: source)
+    monkeypatch.setattr(
+        image_variants,
+        "variant_path",
+        lambda file_name, variant: tmp_path / variant / f"{Path(file_name).stem}.webp",
+    )
+    return source
+
+
+def test_renderer_recovers_from_broken_pool(
+    tmp_path: Path, source_image: Path, monkeypatch: pytest.MonkeyPatch
+):
+    renderer = VariantRenderer(VariantDiskCache(tmp_path, 1024 * 1024))
+    render_variants = image_variants._render_variants
+
+    async def scenario():
+        monkeypatch.setattr(image_variants, "_render_variants", _crash_render)
+        assert await renderer.get("source.png", "thumbnail") is None
+
+        monkeypatch.setattr(image_variants, "_render_variants", render_variants)
+        path = await renderer.get("source.png", "thumbnail")
+        assert path is not None
+        with Image.open(path) as variant:
+            assert variant.size == (160, 80)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        renderer.shutdown()
+
+
+def test_render_rejects_images_over_pixel_limit(
+    tmp_path: Path, source_image: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", Image.MAX_IMAGE_PIXELS)
+    image_variants._init_render_worker(10_000)
+    with pytest.raises(Image.DecompressionBombError):
+        image_variants._render_variants(str(source_image), [(str(tmp_path / "x.webp"), 160)], 80)
@@ -0,0 +1,19 @@
+import os
+from pathlib import Path
+import time
+
+from app.media_storage import LocalMediaStorage
+
+
+def test_put_refreshes_mtime_of_new_file(tmp_path: Path):
+    storage = LocalMediaStorage(tmp_path / "media", "/media/products")
+    part = tmp_path / "upload.part"
+    part.write_bytes(b"image")
+    stale = time.time() - 6 * 60 * 60
+    os.utime(part, (stale, stale))
+
+    digest = "0123456789abcdef0123456789abcdef"
+    url = storage.put(part, digest, ".png")
+
+    assert url == f"/media/products/01/23/{digest}.png"
+    assert list(storage.iter_urls(older_than=time.time() - 60)) == []
@@ -0,0 +1,35 @@
+import csv
+from datetime import UTC, datetime
+from decimal import Decimal
+import io
+
+from app.routers.products import EXPORT_FIELDS, _export_csv_row
+from app.schemas import ProductSchema
+
+
+def test_csv_row_matches_header():
+    now = datetime.now(UTC)
+    product = ProductSchema(
+        id=1,
+        name="Monitor",
+        description="27 inch",
+        price=Decimal("199.90"),
+        image_url="/media/products/0123456789abcdef0123456789abcdef.png",
+        stock=3,
+        category_id=2,
+        seller_id=4,
+        rating=4.5,
+        is_active=True,
+        created_at=now,
+        updated_at=now,
+    )
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    writer.writerow(_export_csv_row(product))
+
+    header, row = csv.reader(io.StringIO(buffer.getvalue()))
+
+    assert len(row) == len(header)
+    assert dict(zip(header, row, strict=True))["image_url"] == product.image_url
+    assert "image_variants" not in header
@@ -0,0 +1,88 @@
+import asyncio
+
+from app.config import settings
+from app.product_import import iter_import_rows
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+def _rows(*parts: bytes, feed_format: str = "csv") -> list:
+    async def collect():
+        return [row async for row in iter_import_rows(_chunks(*parts), feed_format)]
+
+    return asyncio.run(collect())
+
+
+HEADER = b"name,description,price,stock,category_id\n"
+
+
+def test_stray_quote_in_unquoted_field_is_literal():
+    rows = _rows(HEADER, b'Monitor,Foo 5" screen,100,1,1\n', b"Mouse,,10,2,1\n")
+
+    assert rows == [
+        (
+            1,
+            {
+                "name": "Monitor",
+                "description": 'Foo 5" screen',
+                "price": "100",
+                "stock": "1",
+                "category_id": "1",
+            },
+            None,
+        ),
+        (2, {"name": "Mouse", "price": "10", "stock": "2", "category_id": "1"}, None),
+    ]
+
+
+def test_quoted_field_spans_lines_and_chunks():
+    rows = _rows(HEADER, b'Lamp,"first line\nsec', b'ond line",5,1,1\nMouse,,10,2,1\n')
+
+    assert [row[1].get("description") for row in rows] == ["first line\nsecond line", None]
+    assert [row[2] for row in rows] == [None, None]
+
+
+def test_malformed_row_is_reported_and_following_rows_are_parsed():
+    rows = _rows(HEADER, b"Broken,a\rb,1,1,1\n", b"Mouse,,10,2,1\n", b"Keyboard,,20,3,1\n")
+
+    assert rows[0][0] == 1
+    assert rows[0][1] is None
+    assert rows[0][2].startswith("Invalid CSV")
+    assert [(number, data["name"], error) for number, data, error in rows[1:]] == [
+        (2, "Mouse", None),
+        (3, "Keyboard", None),
+    ]
+
+
+def test_unterminated_quote_is_bounded_by_record_length(monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_MAX_RECORD_LENGTH", 100)
+    filler = b"x" * 40 + b"\n"
+
+    rows = _rows(HEADER, b'Broken,"never closed,1,1,1\n', filler * 5, b"Mouse,,10,2,1\n")
+
+    assert "record is longer than 100 characters" in rows[0][2]
+    assert rows[-1] == (
+        len(rows),
+        {"name": "Mouse", "price": "10", "stock": "2", "category_id": "1"},
+        None,
+    )
+
+
+def test_long_line_is_reported_without_buffering(monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_MAX_LINE_LENGTH", 50)
+    long_line = b"Huge," + b"y" * 30 + b"," + b"z" * 30 + b",1,1\n"
+
+    csv_rows = _rows(HEADER, long_line[:20], long_line[20:], b"Mouse,,10,2,1\n")
+    json_rows = _rows(
+        b'{"name": "' + b"y" * 60 + b'"}\n', b'{"name": "Mouse"}\n', feed_format="ndjson"
+    )
+
+    assert "line is longer than 50 characters" in csv_rows[0][2]
+    assert csv_rows[1][1]["name"] == "Mouse"
+    assert json_rows == [
+        (1, None, "Line is longer than 50 characters"),
+        (2, {"name": "Mouse"}, None),
+    ]
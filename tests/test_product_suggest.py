@@ -0,0 +1,23 @@
+import asyncio
+
+from sqlalchemy.dialects import postgresql
+
+from app.config import settings
+from app.routers.products import _suggest_stmt, suggest_products
+
+
+def test_short_prefix_does_not_query_database():
+    # db=None: обращение к базе упало бы с AttributeError
+    assert asyncio.run(suggest_products(q="a", limit=10, db=None)) == []
+
+
+def test_candidates_are_limited_before_sorting():
+    sql = str(
+        _suggest_stmt(["ph"], "ph", 10).compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+    inner, _, outer = sql.partition(") AS anon_1")
+    assert f"LIMIT {10 * settings.SUGGEST_CANDIDATE_FACTOR}" in inner
+    assert "ORDER BY" not in inner
+    assert "ORDER BY" in outer and "LIMIT 10" in outer
@@ -0,0 +1,44 @@
+import asyncio
+
+from app.cache import InMemoryCacheBackend, ResponseCache
+
+
+def make_cache() -> ResponseCache:
+    return ResponseCache(
+        InMemoryCacheBackend(max_entries=2, max_bytes=1024 * 1024),
+        ttl=60.0,
+        miss_backend=InMemoryCacheBackend(max_entries=2, max_bytes=1024 * 1024),
+    )
+
+
+def test_misses_do_not_evict_hits():
+    async def scenario():
+        cache = make_cache()
+        await cache.store("product:1", b"{}", ["product:1"], cache.generation)
+        for product_id in range(100, 110):
+            await cache.store(
+                f"product:{product_id}",
+                b'{"detail":"not found"}',
+                [f"product:{product_id}"],
+                cache.generation,
+                status_code=404,
+            )
+
+        hit = await cache.get("product:1")
+        assert hit is not None and hit.status_code == 200
+        miss = await cache.get("product:109")
+        assert miss is not None and miss.status_code == 404
+        # Старые промахи вытеснены из своего LRU
+        assert await cache.get("product:100") is None
+
+    asyncio.run(scenario())
+
+
+def test_invalidate_clears_misses():
+    async def scenario():
+        cache = make_cache()
+        await cache.store("product:7", b"{}", ["product:7"], cache.generation, status_code=404)
+        await cache.invalidate("product:7")
+        assert await cache.get("product:7") is None
+
+    asyncio.run(scenario())